@@ -0,0 +1,154 @@
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import random
+import time
+from read import (DatabaseOperations, GameDetails, DB_CONFIG, RELATIONSHIP_QUERIES,
+                  fetch_in, resolve_columns, select_list)
+from pool import get_pool
+
+class AsyncDatabaseOperations:
+    """asyncio front end for DatabaseOperations.
+
+    Each query runs on a worker thread with its own pooled pymysql
+    connection, so the event loop never blocks and independent queries run
+    concurrently. The executor is sized to the pool so workers never queue
+    on it. Lookups share the wrapped instance's cache.
+    """
+    def __init__(self, db_ops: Optional[DatabaseOperations] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.db_ops = db_ops or DatabaseOperations(pool=get_pool(DB_CONFIG))
+        if self.db_ops.pool is None:
+            raise ValueError("AsyncDatabaseOperations needs a pooled DatabaseOperations, "
+                             "one connection cannot serve concurrent queries")
+        self.executor = executor or ThreadPoolExecutor(max_workers=self.db_ops.pool.max_size,
+                                                       thread_name_prefix='db')
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def get_game(self, app_id: int, profile: str = 'full',
+                       columns: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        return await self._run(self.db_ops.get_game, app_id, profile, columns)
+
+    async def get_games(self, app_ids: Iterable[int], profile: str = 'full',
+                        columns: Optional[List[str]] = None) -> Dict[int, Optional[Dict[str, Any]]]:
+        return await self._run(self.db_ops.get_games, list(app_ids), profile, columns)
+
+    async def search_games(self, filters: Dict[str, Any] = None, limit: int = 10,
+                           profile: str = 'full',
+                           columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        return await self._run(self.db_ops.search_games, filters, limit, profile, columns)
+
+    def _fetch(self, query: str, app_ids: List[int]) -> List[Dict[str, Any]]:
+        with self.db_ops._connection() as connection, connection.cursor() as cursor:
+            return list(fetch_in(cursor, query, app_ids))
+
+    async def _load_details(self, app_ids: List[int],
+                            projection: Optional[Tuple[str, ...]]) -> Dict[int, GameDetails]:
+        """The games query and every relationship query at once, each on its own connection"""
+        games_query = f"SELECT {select_list(projection)} FROM games WHERE app_id IN ({{ids}})"
+        relations = list(RELATIONSHIP_QUERIES)
+        results = await asyncio.gather(
+            self._run(self._fetch, games_query, app_ids),
+            *(self._run(self._fetch, RELATIONSHIP_QUERIES[relation], app_ids) for relation in relations))
+
+        details = {row['app_id']: GameDetails(game=row) for row in results[0]}
+        for relation, rows in zip(relations, results[1:]):
+            for row in rows:
+                # Relationship rows for ids without a games row are dropped
+                if row['app_id'] in details:
+                    getattr(details[row['app_id']], relation).append(row['value'])
+        return details
+
+    async def get_game_details(self, app_ids: Iterable[int], profile: str = 'full',
+                               columns: Optional[List[str]] = None) -> Dict[int, Optional[GameDetails]]:
+        """Async get_game_details; the eight queries for the misses run concurrently"""
+        projection = resolve_columns(profile, columns)
+        ordered = list(dict.fromkeys(app_ids))
+        kind = ('details', projection)
+        # The sync class's read-through, split around the await
+        found, missing, generation = self.db_ops._cached(kind, ordered)
+        if missing:
+            try:
+                loaded = await self._load_details(missing, projection)
+            except Exception as e:
+                print(f"Error getting game details: {e}")
+                return dict.fromkeys(ordered)
+            self.db_ops._store(kind, loaded, generation)
+            found.update(loaded)
+        return {app_id: self.db_ops._project_details(found.get(app_id), projection) for app_id in ordered}
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+async def _run_async(async_ops: AsyncDatabaseOperations, batches: List[List[int]],
+                     concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(app_ids: List[int]):
+        async with semaphore:
+            await async_ops.get_game_details(app_ids)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(app_ids) for app_ids in batches))
+    return time.perf_counter() - start
+
+def benchmark_async(requests: int = 200, concurrency: int = 20, batch: int = 1, seed: int = 0):
+    """Detail lookups for random games: the sync class one by one, the sync class on
+    concurrency threads, and the async class with concurrency requests in flight.
+
+    The threaded and async runs are the same concurrent workload, so they
+    compare the two classes rather than the concurrency setting. Caching is
+    disabled so every request reaches the database.
+    """
+    pool = get_pool(DB_CONFIG, max_size=concurrency * len(RELATIONSHIP_QUERIES) + 1)
+    sync_ops = DatabaseOperations(pool=pool, cache=None)
+    with pool.connection() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT app_id FROM games")
+        app_ids = [row['app_id'] for row in cursor.fetchall()]
+    if not app_ids:
+        print("No games to benchmark against")
+        return
+    rng = random.Random(seed)
+    batches = [rng.sample(app_ids, min(batch, len(app_ids))) for _ in range(requests)]
+
+    start = time.perf_counter()
+    for app_ids_batch in batches:
+        sync_ops.get_game_details(app_ids_batch)
+    sync_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(sync_ops.get_game_details, batches))
+    threaded_seconds = time.perf_counter() - start
+
+    async_ops = AsyncDatabaseOperations(sync_ops)
+    try:
+        async_seconds = asyncio.run(_run_async(async_ops, batches, concurrency))
+    finally:
+        async_ops.close()
+
+    print(f"{requests} get_game_details requests of {batch} game(s):")
+    print(f"  sync, sequential: {sync_seconds:.2f}s ({requests / sync_seconds:.0f} req/s)")
+    print(f"  sync, {concurrency} threads: {threaded_seconds:.2f}s ({requests / threaded_seconds:.0f} req/s)")
+    print(f"  async, {concurrency} concurrent: {async_seconds:.2f}s ({requests / async_seconds:.0f} req/s)")
+    print(f"  pool: {pool.stats()}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the async data-access layer")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=1, help="Games per get_game_details call")
+    parser.add_argument('--db-host', help="Override the database host, e.g. a local MySQL")
+    parser.add_argument('--db-port', type=int)
+    parser.add_argument('--db-user')
+    parser.add_argument('--db-password')
+    parser.add_argument('--db-name')
+    args = parser.parse_args()
+
+    overrides = {'host': args.db_host, 'port': args.db_port, 'user': args.db_user,
+                 'password': args.db_password, 'db': args.db_name}
+    DB_CONFIG.update({key: value for key, value in overrides.items() if value is not None})
+    benchmark_async(args.requests, args.concurrency, args.batch)
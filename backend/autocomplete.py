@@ -0,0 +1,248 @@
+from typing import Dict, Any, List, Optional, Iterable
+from bisect import bisect_left
+import argparse
+import numpy as np
+import random
+import re
+import threading
+import time
+import unicodedata
+from read import DatabaseOperations, fetch_in, uncached_db_ops
+from changes import RELOAD_FRACTION, subscribe
+
+# Keys are truncated to this many characters; longer prefixes are checked against the name
+MAX_KEY_LENGTH = 32
+# Prefixes up to this length get a precomputed ranking, since their ranges are the largest
+TOP_PREFIX_LENGTH = 3
+TOP_K = 20
+# Upper bound for a prefix range: prefix + this sorts after every key starting with prefix
+RANGE_END = '\U0010ffff'
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and collapse punctuation so 'Pokémon: X' -> 'pokemon x'"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(re.findall(r'\w+', text.casefold()))
+
+def word_suffixes(normalized: str) -> List[str]:
+    """The name from each word start onwards, so 'strike' finds 'counter strike'"""
+    suffixes = [normalized[:MAX_KEY_LENGTH]] if normalized else []
+    for match in re.finditer(r' (?=\w)', normalized):
+        suffixes.append(normalized[match.end():match.end() + MAX_KEY_LENGTH])
+    return list(dict.fromkeys(suffixes))
+
+class AutocompleteIndex:
+    """Prefix search over game names, ranked by positive reviews.
+
+    Every game contributes one key per word start of its normalized name,
+    held in a sorted list with a parallel NumPy array of game positions. A
+    prefix query is two bisects for the matching range and an argpartition
+    of the range's popularity; the largest ranges (prefixes up to
+    TOP_PREFIX_LENGTH characters) have their top TOP_K games precomputed. Once attached, the index refreshes
+    the games passed to cache.invalidate_games, so it follows ingest and
+    update_game without a rebuild.
+    """
+    def __init__(self, db_ops: Optional[DatabaseOperations] = None):
+        self.db_ops = db_ops or uncached_db_ops()
+        self._keys: List[str] = []
+        self._key_positions = np.zeros(0, dtype=np.int32)
+        self._app_ids: List[int] = []
+        self._names: List[Optional[str]] = []
+        self._normalized: List[Optional[str]] = []
+        self._popularity = np.zeros(0, dtype=np.int64)
+        self._positions: Dict[int, int] = {}
+        self._top: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, app_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        query = "SELECT app_id, name, positive_reviews FROM games"
+        with self.db_ops._connection() as connection, connection.cursor() as cursor:
+            if app_ids is None:
+                cursor.execute(query)
+                return list(cursor.fetchall())
+            return list(fetch_in(cursor, query + " WHERE app_id IN ({ids})", app_ids))
+
+    def _set_game(self, position: int, row: Optional[Dict[str, Any]]) -> List[str]:
+        """Store row at position and return its keys (none for a deleted game)"""
+        if row is None:
+            self._names[position] = self._normalized[position] = None
+            self._popularity[position] = -1
+            return []
+        self._names[position] = row['name']
+        self._normalized[position] = normalize(row['name'])
+        self._popularity[position] = row['positive_reviews'] or 0
+        return self._keys_for(position)
+
+    def _keys_for(self, position: int) -> List[str]:
+        normalized = self._normalized[position]
+        return word_suffixes(normalized) if normalized is not None else []
+
+    def _find_key(self, key: str, position: int) -> Optional[int]:
+        """Index of the (key, position) entry; equal keys are ordered by position"""
+        index = bisect_left(self._keys, key)
+        while index < len(self._keys) and self._keys[index] == key:
+            if self._key_positions[index] == position:
+                return index
+            index += 1
+        return None
+
+    def _rank(self, prefix: str, k: int) -> List[int]:
+        """Positions of the k most reviewed games with a key starting with prefix"""
+        clipped = prefix[:MAX_KEY_LENGTH]
+        start = bisect_left(self._keys, clipped)
+        end = bisect_left(self._keys, clipped + RANGE_END, start)
+        positions = self._key_positions[start:end]
+        if len(prefix) > MAX_KEY_LENGTH:
+            positions = np.array([p for p in positions
+                                  if any(suffix.startswith(prefix) for suffix in self._full_suffixes(p))],
+                                 dtype=np.int32)
+        positions = np.unique(positions)
+        if len(positions) > k:
+            # Negated so argpartition's smallest are the most reviewed
+            popularity = -self._popularity[positions]
+            positions = positions[np.argpartition(popularity, k)[:k]]
+        order = np.lexsort((positions, -self._popularity[positions]))
+        return positions[order].tolist()
+
+    def _full_suffixes(self, position: int) -> List[str]:
+        normalized = self._normalized[position]
+        return [normalized[m.start():] for m in re.finditer(r'(?:^|(?<= ))\w', normalized)]
+
+    def _rebuild_top(self, prefixes: Iterable[str]):
+        for prefix in prefixes:
+            top = self._rank(prefix, TOP_K)
+            if top:
+                self._top[prefix] = top
+            else:
+                self._top.pop(prefix, None)
+
+    @staticmethod
+    def _short_prefixes(keys: Iterable[str]) -> set:
+        return {key[:length] for key in keys
+                for length in range(1, min(len(key), TOP_PREFIX_LENGTH) + 1)}
+
+    def load(self, rows: Optional[List[Dict[str, Any]]] = None):
+        """Build the index from (app_id, name, positive_reviews) rows, by default all games"""
+        rows = self._fetch() if rows is None else rows
+        with self._lock:
+            self._app_ids = [row['app_id'] for row in rows]
+            self._names = [None] * len(rows)
+            self._normalized = [None] * len(rows)
+            self._popularity = np.zeros(len(rows), dtype=np.int64)
+            self._positions = {app_id: position for position, app_id in enumerate(self._app_ids)}
+            entries = []
+            for position, row in enumerate(rows):
+                entries.extend((key, position) for key in self._set_game(position, row))
+            entries.sort()
+            self._keys = [key for key, _ in entries]
+            self._key_positions = np.fromiter((position for _, position in entries),
+                                              dtype=np.int32, count=len(entries))
+            self._top = {}
+            self._rebuild_top(self._short_prefixes(self._keys))
+        return self
+
+    def refresh(self, app_ids: Iterable[int]):
+        """Re-read the given games and patch their keys in place"""
+        app_ids = list(dict.fromkeys(app_ids))
+        if not app_ids:
+            return
+        if len(app_ids) > RELOAD_FRACTION * len(self._app_ids):
+            self.load()
+            return
+        rows = {row['app_id']: row for row in self._fetch(app_ids)}
+        with self._lock:
+            touched = set()
+            for app_id in app_ids:
+                position = self._positions.get(app_id)
+                if position is None:
+                    if app_id not in rows:
+                        continue
+                    position = len(self._app_ids)
+                    self._positions[app_id] = position
+                    self._app_ids.append(app_id)
+                    self._names.append(None)
+                    self._normalized.append(None)
+                    self._popularity = np.append(self._popularity, 0)
+                old_keys = self._keys_for(position)
+                for key in old_keys:
+                    index = self._find_key(key, position)
+                    if index is not None:
+                        del self._keys[index]
+                        self._key_positions = np.delete(self._key_positions, index)
+                new_keys = self._set_game(position, rows.get(app_id))
+                for key in new_keys:
+                    index = bisect_left(self._keys, key)
+                    while (index < len(self._keys) and self._keys[index] == key
+                           and self._key_positions[index] < position):
+                        index += 1
+                    self._keys.insert(index, key)
+                    self._key_positions = np.insert(self._key_positions, index, position)
+                touched.update(old_keys)
+                touched.update(new_keys)
+            self._rebuild_top(self._short_prefixes(touched))
+
+    def attach(self, poll_interval: Optional[float] = 30.0):
+        """Refresh this index for every reported write (see changes.subscribe)"""
+        subscribe(self.refresh, self.db_ops, poll_interval)
+        return self
+
+    def complete(self, prefix: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Top k games whose name has a word starting with prefix, most reviewed first"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            if len(prefix) <= TOP_PREFIX_LENGTH and k <= TOP_K:
+                positions = self._top.get(prefix, [])[:k]
+            else:
+                positions = self._rank(prefix, k)
+            return [{'app_id': self._app_ids[p], 'name': self._names[p],
+                     'positive_reviews': int(self._popularity[p])} for p in positions]
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+def benchmark_autocomplete(index: AutocompleteIndex, queries: int = 10000, k: int = 10,
+                           seed: int = 0) -> Dict[str, float]:
+    """Time complete() on random 1-8 character prefixes of real names; prints p50/p99"""
+    rng = random.Random(seed)
+    names = [name for name in index._normalized if name]
+    if not names:
+        print("Index is empty")
+        return {}
+    prefixes = []
+    for _ in range(queries):
+        name = rng.choice(names)
+        start = rng.choice([0] + [m.end() for m in re.finditer(' ', name)])
+        prefixes.append(name[start:start + rng.randint(1, 8)])
+
+    timings = []
+    for prefix in prefixes:
+        start = time.perf_counter_ns()
+        index.complete(prefix, k)
+        timings.append(time.perf_counter_ns() - start)
+    timings.sort()
+
+    def percentile(p: float) -> float:
+        return timings[min(len(timings) - 1, int(len(timings) * p))] / 1000
+
+    stats = {'p50_us': percentile(0.50), 'p99_us': percentile(0.99), 'max_us': timings[-1] / 1000}
+    print(f"{queries} prefix queries over {len(index)} games: "
+          f"p50 {stats['p50_us']:.1f} us, p99 {stats['p99_us']:.1f} us, max {stats['max_us']:.1f} us")
+    return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Autocomplete game names from an in-memory index")
+    parser.add_argument('prefix', nargs='?', help="Prefix to complete")
+    parser.add_argument('-k', type=int, default=10, help="Number of suggestions")
+    parser.add_argument('--benchmark', action='store_true', help="Report p50/p99 query latency")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = AutocompleteIndex().load()
+    print(f"Indexed {len(index)} games in {time.perf_counter() - start:.2f}s")
+    if args.prefix:
+        for game in index.complete(args.prefix, args.k):
+            print(f"{game['app_id']}: {game['name']} ({game['positive_reviews']} positive)")
+    if args.benchmark:
+        benchmark_autocomplete(index, k=args.k)
@@ -0,0 +1,181 @@
+from typing import Dict, Any, Optional, Callable, Iterable, Hashable, List
+from collections import OrderedDict
+import sys
+import threading
+import time
+
+MISSING = object()
+
+def estimate_size(value: Any) -> int:
+    """Approximate deep size in bytes of rows, lists and dataclass-like objects"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(estimate_size(item) for item in value)
+    elif hasattr(value, '__dict__'):
+        size += estimate_size(vars(value))
+    return size
+
+class LRUCache:
+    """Bounded LRU cache with a per-entry TTL and tag-based invalidation.
+
+    Entries are evicted least recently used first once either max_entries or
+    max_bytes is exceeded, and are treated as absent once their TTL expires.
+    Each entry can carry tags (app_ids here) so every entry derived from a
+    game can be dropped at once when that game is written. Cached values are
+    shared between callers and must not be mutated.
+    """
+    def __init__(self, max_entries: int = 10000, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = 300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, size, tags)
+        self._tags = {}  # tag -> set of keys
+        self._bytes = 0
+        self._generation = 0  # bumped by every invalidation
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _remove(self, key: Hashable):
+        _, _, size, tags = self._entries.pop(key)
+        self._bytes -= size
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    @property
+    def generation(self) -> int:
+        """Read before loading from the database and pass to set()"""
+        return self._generation
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = (),
+            ttl: Optional[float] = MISSING, generation: Optional[int] = None):
+        """Store value; skipped if generation is given and an invalidation happened since.
+
+        That keeps a load which raced with a write from caching the old row.
+        """
+        ttl = self.ttl if ttl is MISSING else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = estimate_size(value) if self.max_bytes is not None else 0
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires_at, size, tags)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._entries and (
+                    len(self._entries) > self.max_entries or
+                    (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any],
+                    tags: Iterable[Hashable] = ()) -> Any:
+        """Return the cached value, or load and cache it; None results are not cached"""
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            generation = self._generation
+            value = loader()
+            if value is not None:
+                self.set(key, value, tags, generation=generation)
+        return value
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_tags(self, tags: Iterable[Hashable]):
+        """Drop every entry carrying any of tags"""
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+# Tag for entries computed over the whole catalog (counts, lists) rather than one game
+CATALOG_TAG = 'catalog'
+
+# Caches that hold per-game data, so writers can invalidate them in one call
+_registry: List[LRUCache] = []
+_registry_lock = threading.Lock()
+
+_listeners: List[Callable[[List[int]], None]] = []
+
+def add_listener(listener: Callable[[List[int]], None]):
+    """Call listener with the app_ids of every invalidate_games, after the caches are cleared"""
+    with _registry_lock:
+        _listeners.append(listener)
+
+def register(cache: LRUCache) -> LRUCache:
+    with _registry_lock:
+        _registry.append(cache)
+    return cache
+
+def invalidate_games(app_ids: Iterable[int]):
+    """Drop every cached entry derived from any of app_ids, in all registered caches"""
+    app_ids = list(app_ids)
+    with _registry_lock:
+        caches = list(_registry)
+        listeners = list(_listeners)
+    for cache in caches:
+        cache.invalidate_tags(app_ids + [CATALOG_TAG])
+    for listener in listeners:
+        try:
+            listener(app_ids)
+        except Exception as e:
+            print(f"Error in invalidation listener: {e}")
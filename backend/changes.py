@@ -0,0 +1,119 @@
+from typing import Any, Callable, Iterable, List, Optional, Set, Tuple
+from datetime import datetime, timedelta
+import threading
+from cache import add_listener, invalidate_games
+
+# An index refresh touching more than this share of the games reloads instead of patching
+RELOAD_FRACTION = 0.1
+# Seconds of change timestamps re-read on every poll; a row's timestamp is taken before its commit
+POLL_OVERLAP = 60.0
+# game_summary rows rebuilt and game_deletions tombstones left since a time, as (app_id, changed_at)
+CHANGES_QUERY = """SELECT app_id, updated_at AS changed_at FROM game_summary WHERE updated_at >= %s
+                   UNION ALL
+                   SELECT app_id, deleted_at FROM game_deletions WHERE deleted_at >= %s"""
+
+class ChangeWatcher:
+    """Reports games written by other processes, such as a creation.py run, to this one.
+
+    Every interval seconds the game_summary rows with a newer updated_at,
+    and the games with a newer game_deletions tombstone, are passed to
+    cache.invalidate_games as an in-process write would be, so GAME_CACHE
+    and every attached index refresh. The summary row is the last thing
+    ingest and update_game rebuild for a game, so once it shows up the
+    game's other tables are final. Both timestamps have microsecond
+    resolution, so a game rewritten within a second of the last poll still
+    gets a new one.
+    """
+    def __init__(self, db_ops, interval: float = 30.0):
+        """db_ops is a read.DatabaseOperations (or anything with its _connection)"""
+        self.db_ops = db_ops
+        self.interval = interval
+        self._since: Optional[datetime] = None
+        self._seen: Set[Tuple[int, datetime]] = set()  # the last poll's window, so overlaps aren't re-reported
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _now(self, cursor) -> datetime:
+        # The database clock, which is the one updated_at comes from
+        cursor.execute("SELECT NOW(6) AS now")
+        return cursor.fetchone()['now']
+
+    def poll(self) -> List[int]:
+        """Games written or deleted since the previous poll, or since start()"""
+        with self.db_ops._connection() as connection, connection.cursor() as cursor:
+            now = self._now(cursor)
+            if self._since is None:
+                self._since = now
+            since = self._since - timedelta(seconds=POLL_OVERLAP)
+            cursor.execute(CHANGES_QUERY, (since, since))
+            rows = {(row['app_id'], row['changed_at']) for row in cursor.fetchall()}
+        changed = list(dict.fromkeys(app_id for app_id, _ in sorted(rows - self._seen)))
+        self._seen = rows
+        self._since = now
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                changed = self.poll()
+                if changed:
+                    invalidate_games(changed)
+            except Exception as e:
+                print(f"Error polling for game changes: {e}")
+
+    def start(self):
+        """Poll every interval seconds on a daemon thread, starting from now"""
+        if self._thread is None:
+            try:
+                with self.db_ops._connection() as connection, connection.cursor() as cursor:
+                    self._since = self._now(cursor)
+            except Exception as e:
+                # The first successful poll starts the clock instead
+                print(f"Error starting change watcher: {e}")
+            self._thread = threading.Thread(target=self._run, name='change-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+_watcher: Optional[ChangeWatcher] = None
+_watcher_lock = threading.Lock()
+
+def watch(db_ops, interval: float = 30.0) -> ChangeWatcher:
+    """Start this process's ChangeWatcher, or return the running one.
+
+    One is enough however many caches and indexes there are, since every
+    change goes through invalidate_games.
+    """
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = ChangeWatcher(db_ops, interval).start()
+        return _watcher
+
+def subscribe(listener: Callable[[List[int]], Any], db_ops, poll_interval: Optional[float] = 30.0):
+    """Call listener with the app_ids of every write reported through cache.invalidate_games.
+
+    With a poll_interval, writes by other processes (creation.py runs) are
+    picked up by the shared ChangeWatcher too.
+    """
+    add_listener(listener)
+    if poll_interval is not None:
+        watch(db_ops, poll_interval)
+
+class Debouncer:
+    """Runs action delay seconds after the last trigger(), so a burst of writes runs it once"""
+    def __init__(self, delay: float, action: Callable[[], Any]):
+        self.delay = delay
+        self.action = action
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def trigger(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.action)
+            self._timer.daemon = True
+            self._timer.start()
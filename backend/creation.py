@@ -1,11 +1,25 @@
 import pymysql
 import polars as pl
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import argparse
 import ast
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+import time
 from tqdm import tqdm
 import pandas as pd
 import json
+from cache import invalidate_games
+from read import REFERENCE_TABLES, MEDIA_TABLES, IN_CLAUSE_CHUNK
+from summary import (GAME_SUMMARY_SCHEMA, GAME_SUMMARY_KEYS, GAME_DELETIONS_SCHEMA, GAME_DELETIONS_KEYS,
+                     refresh_game_summary, ensure_summary_columns)
+from snapshot import export_snapshot, latest_snapshot
 
 # Database connection configuration
 DB_CONFIG = {
@@ -21,12 +35,13 @@ DB_CONFIG = {
     "write_timeout": 10,
 }
 
-def create_database_schema(connection):
-    """Create all necessary tables in the database"""
-    # Split the CREATE_TABLES_SQL into individual statements
-    statements = [
-        """
-        CREATE TABLE IF NOT EXISTS games (
+# Games written per multi-row batch (and per commit) during ingest
+DEFAULT_BATCH_SIZE = 500
+
+# Table bodies without secondary indexes or foreign keys; the UNIQUE name
+# indexes stay because INSERT IGNORE relies on them
+SCHEMA_TABLES = {
+    'games': """
             app_id BIGINT PRIMARY KEY,
             name VARCHAR(255) NOT NULL,
             release_date DATE,
@@ -58,110 +73,121 @@ def create_database_schema(connection):
             average_playtime_forever INT,
             average_playtime_two_weeks INT,
             median_playtime_forever INT,
-            median_playtime_two_weeks INT,
-            INDEX idx_name (name),
-            INDEX idx_release_date (release_date),
-            INDEX idx_price (price),
-            INDEX idx_metacritic (metacritic_score)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS developers (
+            median_playtime_two_weeks INT""",
+    'developers': """
             id INT AUTO_INCREMENT PRIMARY KEY,
             name VARCHAR(255) NOT NULL,
-            UNIQUE INDEX idx_dev_name (name)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS publishers (
+            UNIQUE INDEX idx_dev_name (name)""",
+    'publishers': """
             id INT AUTO_INCREMENT PRIMARY KEY,
             name VARCHAR(255) NOT NULL,
-            UNIQUE INDEX idx_pub_name (name)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS categories (
+            UNIQUE INDEX idx_pub_name (name)""",
+    'categories': """
             id INT AUTO_INCREMENT PRIMARY KEY,
             name VARCHAR(255) NOT NULL,
-            UNIQUE INDEX idx_cat_name (name)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS genres (
+            UNIQUE INDEX idx_cat_name (name)""",
+    'genres': """
             id INT AUTO_INCREMENT PRIMARY KEY,
             name VARCHAR(255) NOT NULL,
-            UNIQUE INDEX idx_genre_name (name)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS tags (
+            UNIQUE INDEX idx_genre_name (name)""",
+    'tags': """
             id INT AUTO_INCREMENT PRIMARY KEY,
             name VARCHAR(255) NOT NULL,
-            UNIQUE INDEX idx_tag_name (name)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS screenshots (
+            UNIQUE INDEX idx_tag_name (name)""",
+    'screenshots': """
             id INT AUTO_INCREMENT PRIMARY KEY,
             app_id BIGINT,
-            url VARCHAR(255) NOT NULL,
-            FOREIGN KEY fk_screenshots_game (app_id) REFERENCES games(app_id)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS movies (
+            url VARCHAR(255) NOT NULL""",
+    'movies': """
             id INT AUTO_INCREMENT PRIMARY KEY,
             app_id BIGINT,
-            url VARCHAR(255) NOT NULL,
-            FOREIGN KEY fk_movies_game (app_id) REFERENCES games(app_id)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS game_developers (
+            url VARCHAR(255) NOT NULL""",
+    'game_developers': """
             app_id BIGINT,
             developer_id INT,
-            PRIMARY KEY (app_id, developer_id),
-            FOREIGN KEY fk_gd_game (app_id) REFERENCES games(app_id),
-            FOREIGN KEY fk_gd_developer (developer_id) REFERENCES developers(id)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS game_publishers (
+            PRIMARY KEY (app_id, developer_id)""",
+    'game_publishers': """
             app_id BIGINT,
             publisher_id INT,
-            PRIMARY KEY (app_id, publisher_id),
-            FOREIGN KEY fk_gp_game (app_id) REFERENCES games(app_id),
-            FOREIGN KEY fk_gp_publisher (publisher_id) REFERENCES publishers(id)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS game_categories (
+            PRIMARY KEY (app_id, publisher_id)""",
+    'game_categories': """
             app_id BIGINT,
             category_id INT,
-            PRIMARY KEY (app_id, category_id),
-            FOREIGN KEY fk_gc_game (app_id) REFERENCES games(app_id),
-            FOREIGN KEY fk_gc_category (category_id) REFERENCES categories(id)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS game_genres (
+            PRIMARY KEY (app_id, category_id)""",
+    'game_genres': """
             app_id BIGINT,
             genre_id INT,
-            PRIMARY KEY (app_id, genre_id),
-            FOREIGN KEY fk_gg_game (app_id) REFERENCES games(app_id),
-            FOREIGN KEY fk_gg_genre (genre_id) REFERENCES genres(id)
-        )
-        """,
-        """
-        CREATE TABLE IF NOT EXISTS game_tags (
+            PRIMARY KEY (app_id, genre_id)""",
+    'game_tags': """
             app_id BIGINT,
             tag_id INT,
-            PRIMARY KEY (app_id, tag_id),
-            FOREIGN KEY fk_gt_game (app_id) REFERENCES games(app_id),
-            FOREIGN KEY fk_gt_tag (tag_id) REFERENCES tags(id)
+            PRIMARY KEY (app_id, tag_id)""",
+    'game_hashes': """
+            app_id BIGINT PRIMARY KEY,
+            content_hash CHAR(40) NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP""",
+    'game_summary': GAME_SUMMARY_SCHEMA,
+    'game_deletions': GAME_DELETIONS_SCHEMA,
+}
+
+# Secondary indexes and foreign keys per table, which a bulk load adds last
+SCHEMA_KEYS = {
+    'games': [
+        "INDEX idx_name (name)",
+        "INDEX idx_release_date (release_date)",
+        "INDEX idx_price (price)",
+        "INDEX idx_metacritic (metacritic_score)",
+    ],
+    'screenshots': ["FOREIGN KEY fk_screenshots_game (app_id) REFERENCES games(app_id)"],
+    'movies': ["FOREIGN KEY fk_movies_game (app_id) REFERENCES games(app_id)"],
+    'game_developers': [
+        "FOREIGN KEY fk_gd_game (app_id) REFERENCES games(app_id)",
+        "FOREIGN KEY fk_gd_developer (developer_id) REFERENCES developers(id)",
+    ],
+    'game_publishers': [
+        "FOREIGN KEY fk_gp_game (app_id) REFERENCES games(app_id)",
+        "FOREIGN KEY fk_gp_publisher (publisher_id) REFERENCES publishers(id)",
+    ],
+    'game_categories': [
+        "FOREIGN KEY fk_gc_game (app_id) REFERENCES games(app_id)",
+        "FOREIGN KEY fk_gc_category (category_id) REFERENCES categories(id)",
+    ],
+    'game_genres': [
+        "FOREIGN KEY fk_gg_game (app_id) REFERENCES games(app_id)",
+        "FOREIGN KEY fk_gg_genre (genre_id) REFERENCES genres(id)",
+    ],
+    'game_tags': [
+        "FOREIGN KEY fk_gt_game (app_id) REFERENCES games(app_id)",
+        "FOREIGN KEY fk_gt_tag (tag_id) REFERENCES tags(id)",
+    ],
+    'game_hashes': ["FOREIGN KEY fk_gh_game (app_id) REFERENCES games(app_id) ON DELETE CASCADE"],
+    'game_summary': GAME_SUMMARY_KEYS,
+    'game_deletions': GAME_DELETIONS_KEYS,
+}
+
+# FULLTEXT indexes on games for search_games; InnoDB builds only one per ALTER TABLE
+SEARCH_INDEXES = {
+    'ft_name': ['name'],
+    'ft_name_about': ['name', 'about_the_game'],
+}
+
+def create_database_schema(connection, deferred_keys: bool = False):
+    """Create all necessary tables in the database.
+    
+    With deferred_keys the secondary indexes and foreign keys are left out;
+    add them with build_deferred_keys once the data is loaded.
+    """
+    statements = []
+    for table, body in SCHEMA_TABLES.items():
+        keys = [] if deferred_keys else SCHEMA_KEYS.get(table, [])
+        if table == 'games' and not deferred_keys:
+            keys = keys + [f"FULLTEXT INDEX {index} ({', '.join(columns)})"
+                           for index, columns in SEARCH_INDEXES.items()]
+        definitions = body + ''.join(f",\n            {key}" for key in keys)
+        statements.append(f"""
+        CREATE TABLE IF NOT EXISTS {table} ({definitions}
         )
-        """
-    ]
+        """)
     
     try:
         with connection.cursor() as cursor:
@@ -182,6 +208,71 @@ def create_database_schema(connection):
         connection.rollback()
         raise
 
+def build_deferred_keys(connection):
+    """Add the secondary indexes and foreign keys skipped by a deferred schema"""
+    ensure_schema_keys(connection)
+    ensure_search_indexes(connection)
+
+def key_signature(table: str, key: str) -> tuple:
+    """What identifies a SCHEMA_KEYS entry in information_schema.
+
+    Indexes go by name. Foreign keys go by (column, referenced table): MySQL
+    ignores the name after FOREIGN KEY and calls the constraint <table>_ibfk_<n>.
+    """
+    foreign = re.match(r'FOREIGN KEY \w+ \((\w+)\) REFERENCES (\w+)', key)
+    if foreign:
+        return (table, 'foreign', foreign.group(1), foreign.group(2))
+    return (table, 'index', re.match(r'INDEX (\w+)', key).group(1))
+
+def ensure_schema_keys(connection):
+    """Add any SCHEMA_KEYS index or foreign key its table doesn't have yet.
+
+    CREATE TABLE IF NOT EXISTS leaves existing tables alone, so keys added
+    to SCHEMA_KEYS later (or skipped by an interrupted bulk load) only
+    reach an existing database through here. A table whose keys can't be
+    added (say, orphaned rows for a new foreign key) is reported and skipped.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""SELECT DISTINCT table_name AS `table`, index_name AS name
+                          FROM information_schema.statistics WHERE table_schema = DATABASE()""")
+        existing = {(row['table'], 'index', row['name']) for row in cursor.fetchall()}
+        cursor.execute("""SELECT table_name AS `table`, column_name AS `column`, referenced_table_name AS referenced
+                          FROM information_schema.key_column_usage
+                          WHERE table_schema = DATABASE() AND referenced_table_name IS NOT NULL""")
+        existing.update((row['table'], 'foreign', row['column'], row['referenced']) for row in cursor.fetchall())
+        for table, keys in SCHEMA_KEYS.items():
+            missing = [key for key in keys if key_signature(table, key) not in existing]
+            if not missing:
+                continue
+            try:
+                # One ALTER per table so each table is rebuilt only once
+                cursor.execute(f"ALTER TABLE {table} " + ", ".join(f"ADD {key}" for key in missing))
+                print(f"Added {len(missing)} keys to {table}")
+            except Exception as e:
+                print(f"Error adding keys to {table}: {e}")
+    connection.commit()
+
+def ensure_search_indexes(connection):
+    """Add any FULLTEXT index from SEARCH_INDEXES that games doesn't have yet"""
+    with connection.cursor() as cursor:
+        cursor.execute("""SELECT DISTINCT index_name AS name FROM information_schema.statistics
+                          WHERE table_schema = DATABASE() AND table_name = 'games'""")
+        existing = {row['name'] for row in cursor.fetchall()}
+        for index, columns in SEARCH_INDEXES.items():
+            if index not in existing:
+                cursor.execute(f"ALTER TABLE games ADD FULLTEXT INDEX {index} ({', '.join(columns)})")
+                print(f"Added full-text index {index} to games")
+    connection.commit()
+
+def schema_exists(connection) -> bool:
+    """Whether any of the ingest tables already exists"""
+    placeholders = ', '.join(['%s'] * len(SCHEMA_TABLES))
+    with connection.cursor() as cursor:
+        cursor.execute(f"""SELECT COUNT(*) AS count FROM information_schema.tables
+                          WHERE table_schema = DATABASE() AND table_name IN ({placeholders})""",
+                       list(SCHEMA_TABLES))
+        return cursor.fetchone()['count'] > 0
+
 
 
 
@@ -199,137 +290,425 @@ def safe_literal_eval(s):
             return []
     return []
 
-def get_or_create_reference(cursor, table_name: str, name: str) -> int:
+class ReferenceCache:
+    """In-memory name -> id cache for the reference tables.
+    
+    Names inserted since the last commit are tracked so a rollback can drop
+    ids that no longer exist in the database. Lookups are safe to share
+    between ingest worker threads.
+    """
+    def __init__(self):
+        self.ids = {table: {} for table in REFERENCE_TABLES}
+        # Names with no matching row even after INSERT IGNORE, e.g. longer than the name column
+        self.unresolved = {table: set() for table in REFERENCE_TABLES}
+        self.hits = 0
+        self.misses = 0
+        self._pending = []
+        self._lock = threading.Lock()
+    
+    def preload(self, cursor):
+        """Load every existing reference name with one query per table"""
+        for table, ids in self.ids.items():
+            cursor.execute(f"SELECT id, name FROM {table}")
+            ids.update((row['name'], row['id']) for row in cursor.fetchall())
+    
+    def get(self, table_name: str, name: str) -> Optional[int]:
+        ref_id = self.ids[table_name].get(name)
+        with self._lock:
+            if ref_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return ref_id
+    
+    def record_hits(self, count: int):
+        """Count lookups that were served in bulk from the cached frames"""
+        with self._lock:
+            self.hits += count
+    
+    def ensure(self, cursor, table_name: str, names: List[str]):
+        """Make sure every name has an id, creating missing ones in bulk.
+
+        A name that still has no row afterwards is reported once and left
+        out, so only the games using it lose that link.
+        """
+        ids = self.ids[table_name]
+        unresolved = self.unresolved[table_name]
+        missing = [name for name in names
+                   if name not in unresolved and self.get(table_name, name) is None]
+        if not missing:
+            return
+        
+        cursor.executemany(f"INSERT IGNORE INTO {table_name} (name) VALUES (%s)",
+                           [(name,) for name in missing])
+        for start in range(0, len(missing), IN_CLAUSE_CHUNK):
+            chunk = missing[start:start + IN_CLAUSE_CHUNK]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f"SELECT id, name FROM {table_name} WHERE name IN ({placeholders})",
+                           chunk)
+            for row in cursor.fetchall():
+                self.add(table_name, row['name'], row['id'])
+        
+        # The collation may match a name to a differently cased or padded row
+        for name in missing:
+            if name not in ids:
+                cursor.execute(f"SELECT id FROM {table_name} WHERE name = %s", (name,))
+                row = cursor.fetchone()
+                if row is None:
+                    print(f"Warning: no {table_name} row for {name[:80]!r} ({len(name)} chars); "
+                          f"skipping that link")
+                    with self._lock:
+                        unresolved.add(name)
+                    continue
+                self.add(table_name, name, row['id'])
+    
+    def frame(self, table_name: str) -> pl.DataFrame:
+        """Cached names and ids of a table as a (name, ref_id) DataFrame"""
+        ids = self.ids[table_name]
+        return pl.DataFrame({'name': list(ids.keys()), 'ref_id': list(ids.values())},
+                            schema={'name': pl.String, 'ref_id': pl.Int64})
+    
+    def add(self, table_name: str, name: str, ref_id: int):
+        with self._lock:
+            self.ids[table_name][name] = ref_id
+            self._pending.append((table_name, name))
+    
+    def commit(self):
+        with self._lock:
+            self._pending.clear()
+    
+    def rollback(self):
+        with self._lock:
+            for table_name, name in self._pending:
+                self.ids[table_name].pop(name, None)
+            self._pending.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': sum(len(ids) for ids in self.ids.values()),
+        }
+
+def get_or_create_reference(cursor, table_name: str, name: str,
+                            cache: Optional[ReferenceCache] = None) -> int:
     """Get ID for reference data or create if it doesn't exist"""
+    if cache is not None:
+        ref_id = cache.get(table_name, name)
+        if ref_id is not None:
+            return ref_id
+    
     cursor.execute(f"SELECT id FROM {table_name} WHERE name = %s", (name,))
     result = cursor.fetchone()
     
     if result:
-        return result['id']
+        ref_id = result['id']
+    else:
+        cursor.execute(f"INSERT INTO {table_name} (name) VALUES (%s)", (name,))
+        ref_id = cursor.lastrowid
+    
+    if cache is not None:
+        cache.add(table_name, name, ref_id)
+    return ref_id
+
+# games column -> CSV column
+GAME_CSV_COLUMNS = {
+    'app_id': 'AppID',
+    'name': 'Name',
+    'release_date': 'Release date',
+    'estimated_owners': 'Estimated owners',
+    'peak_ccu': 'Peak CCU',
+    'required_age': 'Required age',
+    'price': 'Price',
+    'dlc_count': 'DLC count',
+    'about_the_game': 'About the game',
+    'supported_languages': 'Supported languages',
+    'full_audio_languages': 'Full audio languages',
+    'reviews': 'Reviews',
+    'header_image': 'Header image',
+    'website': 'Website',
+    'support_url': 'Support url',
+    'support_email': 'Support email',
+    'windows': 'Windows',
+    'mac': 'Mac',
+    'linux': 'Linux',
+    'metacritic_score': 'Metacritic score',
+    'metacritic_url': 'Metacritic url',
+    'user_score': 'User score',
+    'positive_reviews': 'Positive',
+    'negative_reviews': 'Negative',
+    'score_rank': 'Score rank',
+    'achievements': 'Achievements',
+    'recommendations': 'Recommendations',
+    'notes': 'Notes',
+    'average_playtime_forever': 'Average playtime forever',
+    'average_playtime_two_weeks': 'Average playtime two weeks',
+    'median_playtime_forever': 'Median playtime forever',
+    'median_playtime_two_weeks': 'Median playtime two weeks',
+}
+
+GAME_COLUMNS = list(GAME_CSV_COLUMNS)
+
+INT_COLUMNS = [
+    'app_id', 'peak_ccu', 'required_age', 'dlc_count', 'metacritic_score', 'user_score',
+    'positive_reviews', 'negative_reviews', 'achievements', 'recommendations',
+    'average_playtime_forever', 'average_playtime_two_weeks',
+    'median_playtime_forever', 'median_playtime_two_weeks'
+]
+
+FLAG_COLUMNS = ['windows', 'mac', 'linux']
+
+JSON_LIST_COLUMNS = ['supported_languages', 'full_audio_languages']
+
+# List column of the normalized frame -> CSV column, for references and media
+LIST_COLUMNS = {
+    'developers': 'Developers',
+    'publishers': 'Publishers',
+    'categories': 'Categories',
+    'genres': 'Genres',
+    'tags': 'Tags',
+    'screenshots': 'Screenshots',
+    'movies': 'Movies',
+}
+
+HASH_UPSERT_SQL = """INSERT INTO game_hashes (app_id, content_hash) 
+                 VALUES (%s, %s)
+                 ON DUPLICATE KEY UPDATE content_hash=VALUES(content_hash)"""
+
+GAME_UPSERT_SQL = f"""INSERT INTO games ({', '.join(GAME_COLUMNS)}) 
+                 VALUES ({', '.join(['%s'] * len(GAME_COLUMNS))})
+                 ON DUPLICATE KEY UPDATE {', '.join(f"{k}=VALUES({k})" for k in GAME_COLUMNS)}"""
+
+def _split_list(column: str) -> pl.Expr:
+    """Parse a "['a', 'b']" or "a,b" column into a list of stripped strings"""
+    return (
+        pl.col(column).cast(pl.String).str.strip_chars("[]").str.split(',')
+        .list.eval(pl.element().str.strip_chars().str.strip_chars("'\"").str.strip_chars())
+        .list.eval(pl.element().filter(pl.element() != ''))
+        .fill_null(pl.lit([], dtype=pl.List(pl.String)))
+    )
+
+def _json_list(names: pl.Expr) -> pl.Expr:
+    """Encode a list of strings as a JSON array string"""
+    quoted = names.list.eval(pl.concat_str(
+        pl.lit('"'),
+        pl.element().str.replace_all('\\', '\\\\', literal=True)
+        .str.replace_all('"', '\\"', literal=True),
+        pl.lit('"'),
+    ))
+    return pl.concat_str(pl.lit('['), quoted.list.join(', '), pl.lit(']'))
+
+def _parse_date(column: str) -> pl.Expr:
+    """Parse Steam release dates such as "Aug 21, 2012" or "Aug 2012" """
+    value = pl.col(column).cast(pl.String).str.strip_chars()
+    return pl.coalesce(
+        value.str.to_date('%b %d, %Y', strict=False),
+        value.str.to_date('%B %d, %Y', strict=False),
+        value.str.to_date('%Y-%m-%d', strict=False),
+        pl.concat_str(pl.lit('1 '), value).str.to_date('%d %b %Y', strict=False),
+    )
+
+def _parse_flag(column: str) -> pl.Expr:
+    """Boolean-ish column as a 0/1 TINYINT value"""
+    return (pl.col(column).cast(pl.String).str.to_lowercase()
+            .is_in(['true', '1']).fill_null(False).cast(pl.Int8))
+
+def normalize_games_frame(df: pl.DataFrame) -> pl.DataFrame:
+    """Turn the raw CSV frame into typed games columns plus list columns.
+    
+    The result has one column per games table column, ready to be bound as
+    statement parameters, and a List[str] column per reference/media table.
+    Columns may arrive already typed or as plain strings.
+    """
+    expressions = []
+    for column, csv_column in GAME_CSV_COLUMNS.items():
+        if column in INT_COLUMNS:
+            expr = pl.col(csv_column).cast(pl.Int64, strict=False)
+        elif column in FLAG_COLUMNS:
+            expr = _parse_flag(csv_column)
+        elif column in JSON_LIST_COLUMNS:
+            expr = _json_list(_split_list(csv_column))
+        elif column == 'release_date':
+            expr = _parse_date(csv_column)
+        elif column == 'price':
+            expr = pl.col(csv_column).cast(pl.Float64, strict=False).fill_null(0.0)
+        else:
+            expr = pl.col(csv_column).cast(pl.String)
+        expressions.append(expr.alias(column))
+    
+    for column, csv_column in LIST_COLUMNS.items():
+        expressions.append(_split_list(csv_column).alias(column))
+    
+    return df.select(expressions)
+
+def with_content_hash(df: pl.DataFrame) -> pl.DataFrame:
+    """Add a content_hash column: SHA-1 over every normalized column of a game.
+    
+    Polars' own hash() is not stable across versions, so the canonical row
+    text is built vectorized and hashed with hashlib to allow persisting it.
+    """
+    parts = []
+    for column in GAME_COLUMNS + list(LIST_COLUMNS):
+        if column in LIST_COLUMNS:
+            value = pl.col(column).list.join('\x1f')
+        else:
+            value = pl.col(column).cast(pl.String)
+        parts.append(value.fill_null('\x00'))
+    canonical = pl.concat_str(parts, separator='\x1e')
+    return df.with_columns(
+        canonical.map_elements(lambda text: hashlib.sha1(text.encode('utf-8')).hexdigest(),
+                               return_dtype=pl.String).alias('content_hash')
+    )
+
+def filter_changed_games(cursor, df: pl.DataFrame) -> pl.DataFrame:
+    """Keep only the games of df that are new or whose content_hash changed"""
+    app_ids = df['app_id'].unique().to_list()
+    stored = []
+    for start in range(0, len(app_ids), IN_CLAUSE_CHUNK):
+        chunk = app_ids[start:start + IN_CLAUSE_CHUNK]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"SELECT app_id, content_hash FROM game_hashes WHERE app_id IN ({placeholders})",
+                       chunk)
+        stored.extend((row['app_id'], row['content_hash']) for row in cursor.fetchall())
+    
+    stored = pl.DataFrame(stored, schema={'app_id': pl.Int64, 'stored_hash': pl.String},
+                          orient='row')
+    return (
+        df.join(stored, on='app_id', how='left', maintain_order='left')
+        .filter(pl.col('stored_hash').is_null() | (pl.col('stored_hash') != pl.col('content_hash')))
+        .drop('stored_hash')
+    )
+
+def reference_links_frame(df: pl.DataFrame, table_name: str) -> pl.DataFrame:
+    """Explode a normalized reference list column into distinct (app_id, name) rows"""
+    return (
+        df.select('app_id', pl.col(table_name).alias('name'))
+        .explode('name')
+        .filter(pl.col('name').is_not_null())
+        .unique(maintain_order=True)
+    )
+
+def resolve_references(cursor, df: pl.DataFrame, cache: ReferenceCache):
+    """Create every reference name used by df with one bulk insert per table"""
+    for table in REFERENCE_TABLES:
+        names = reference_links_frame(df, table).get_column('name').unique().to_list()
+        cache.ensure(cursor, table, names)
+
+def build_junction_frames(df: pl.DataFrame, cache: ReferenceCache) -> Dict[str, pl.DataFrame]:
+    """Join resolved ids back onto df, giving (app_id, ref_id) rows per reference table.
+    
+    Names must already be resolved with resolve_references.
+    """
+    junctions = {}
+    for table in REFERENCE_TABLES:
+        links = reference_links_frame(df, table).join(cache.frame(table), on='name', how='inner')
+        # Every joined occurrence is a lookup served from the cache
+        cache.record_hits(links.height)
+        junctions[table] = links.select('app_id', 'ref_id').unique(maintain_order=True)
+    return junctions
+
+def sync_media(cursor, table_name: str, urls_by_app: Dict[int, List[str]],
+               fresh_load: bool = False):
+    """Make the screenshots/movies rows of the given games match urls_by_app.
+    
+    The current rows of all the games are loaded in one query and only the
+    difference is written, so unchanged media cause no writes at all.
+    fresh_load skips that lookup for a first load into empty tables, which
+    have no app_id index while their keys are deferred.
+    """
+    app_ids = [] if fresh_load else list(urls_by_app)
+    existing = {}
+    for start in range(0, len(app_ids), IN_CLAUSE_CHUNK):
+        chunk = app_ids[start:start + IN_CLAUSE_CHUNK]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"SELECT id, app_id, url FROM {table_name} WHERE app_id IN ({placeholders})",
+                       chunk)
+        for row in cursor.fetchall():
+            existing.setdefault(row['app_id'], {}).setdefault(row['url'], []).append(row['id'])
     
-    cursor.execute(f"INSERT INTO {table_name} (name) VALUES (%s)", (name,))
-    return cursor.lastrowid
+    stale_ids = []
+    added = []
+    for app_id, urls in urls_by_app.items():
+        wanted = dict.fromkeys(urls)
+        current = existing.get(app_id, {})
+        for url, ids in current.items():
+            # Drop removed URLs and any duplicate rows of kept ones
+            stale_ids.extend(ids if url not in wanted else ids[1:])
+        added.extend((app_id, url) for url in wanted if url not in current)
+    
+    for start in range(0, len(stale_ids), IN_CLAUSE_CHUNK):
+        chunk = stale_ids[start:start + IN_CLAUSE_CHUNK]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"DELETE FROM {table_name} WHERE id IN ({placeholders})", chunk)
+    if added:
+        cursor.executemany(f"""INSERT INTO {table_name} (app_id, url) 
+                            VALUES (%s, %s)""", added)
+
+def sync_links(cursor, table_name: str, ref_ids_by_app: Dict[int, List[int]],
+               fresh_load: bool = False) -> List[Tuple[int, int]]:
+    """Delete the junction rows of the given games that ref_ids_by_app no longer lists.
+    
+    table_name is a reference table; its junction rows are read for all
+    the games in one query, as in sync_media. Returns the (app_id, ref_id)
+    rows that are still missing, for the caller to insert. fresh_load
+    skips the lookup, since the tables started empty.
+    """
+    junction_table, junction_column = REFERENCE_TABLES[table_name]
+    app_ids = [] if fresh_load else list(ref_ids_by_app)
+    existing = {}
+    for start in range(0, len(app_ids), IN_CLAUSE_CHUNK):
+        chunk = app_ids[start:start + IN_CLAUSE_CHUNK]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"""SELECT app_id, {junction_column} AS ref_id FROM {junction_table}
+                          WHERE app_id IN ({placeholders})""", chunk)
+        for row in cursor.fetchall():
+            existing.setdefault(row['app_id'], set()).add(row['ref_id'])
+    
+    stale = []
+    added = []
+    for app_id, ref_ids in ref_ids_by_app.items():
+        wanted = dict.fromkeys(ref_ids)
+        current = existing.get(app_id, set())
+        stale.extend((app_id, ref_id) for ref_id in current if ref_id not in wanted)
+        added.extend((app_id, ref_id) for ref_id in wanted if ref_id not in current)
+    if stale:
+        cursor.executemany(f"DELETE FROM {junction_table} WHERE app_id = %s AND {junction_column} = %s",
+                           stale)
+    return added
+
+def ref_ids_by_app(df: pl.DataFrame, links: pl.DataFrame) -> Dict[int, List[int]]:
+    """Every game of df with the ref_ids of its (app_id, ref_id) links, possibly none"""
+    ref_ids = {app_id: [] for app_id in df['app_id'].to_list()}
+    for app_id, ref_id in links.rows():
+        ref_ids[app_id].append(ref_id)
+    return ref_ids
 
 # Update the process_game_row function to handle boolean values correctly
-def process_game_row(cursor, row: Dict[str, Any]) -> bool:
-    """Process a single game row with all its relationships"""
+def process_game_row(cursor, row: Dict[str, Any],
+                     cache: Optional[ReferenceCache] = None, fresh_load: bool = False) -> bool:
+    """Process a single normalized game row with all its relationships"""
     try:
-        app_id = row['AppID']
-        
-        # Prepare main game data
-        game_data = {
-            'app_id': app_id,
-            'name': row['Name'],
-            'release_date': pl.from_pandas(pd.to_datetime([row['Release date']])).dt.date()[0] if row['Release date'] else None,
-            'estimated_owners': row['Estimated owners'],
-            'peak_ccu': row['Peak CCU'],
-            'required_age': row['Required age'],
-            'price': float(row['Price']) if row['Price'] else 0.0,
-            'dlc_count': row['DLC count'],
-            'about_the_game': row['About the game'],
-            'supported_languages': json.dumps(safe_literal_eval(row['Supported languages'])),
-            'full_audio_languages': json.dumps(safe_literal_eval(row['Full audio languages'])),
-            'reviews': row['Reviews'],
-            'header_image': row['Header image'],
-            'website': row['Website'],
-            'support_url': row['Support url'],
-            'support_email': row['Support email'],
-            # Convert boolean values to integers for MySQL
-            'windows': 1 if row['Windows'] else 0,
-            'mac': 1 if row['Mac'] else 0,
-            'linux': 1 if row['Linux'] else 0,
-            'metacritic_score': row['Metacritic score'],
-            'metacritic_url': row['Metacritic url'],
-            'user_score': row['User score'],
-            'positive_reviews': row['Positive'],
-            'negative_reviews': row['Negative'],
-            'score_rank': row['Score rank'],
-            'achievements': row['Achievements'],
-            'recommendations': row['Recommendations'],
-            'notes': row['Notes'],
-            'average_playtime_forever': row['Average playtime forever'],
-            'average_playtime_two_weeks': row['Average playtime two weeks'],
-            'median_playtime_forever': row['Median playtime forever'],
-            'median_playtime_two_weeks': row['Median playtime two weeks']
-        }
+        app_id = row['app_id']
         
         # Insert or update game
-        placeholders = ', '.join(['%s'] * len(game_data))
-        columns = ', '.join(game_data.keys())
-        values = tuple(game_data.values())
-        update_stmt = ', '.join(f"{k}=VALUES({k})" for k in game_data.keys())
-        
-        sql = f"""INSERT INTO games ({columns}) 
-                 VALUES ({placeholders})
-                 ON DUPLICATE KEY UPDATE {update_stmt}"""
-        cursor.execute(sql, values)
-        
-        # Process developers
-        developers = safe_literal_eval(row['Developers'])
-        if isinstance(developers, str):
-            developers = [developers]
-        for dev in developers:
-            if dev and dev.strip():
-                dev_id = get_or_create_reference(cursor, 'developers', dev.strip())
-                cursor.execute("""INSERT IGNORE INTO game_developers (app_id, developer_id) 
-                                VALUES (%s, %s)""", (app_id, dev_id))
-        
-        # Process publishers
-        publishers = safe_literal_eval(row['Publishers'])
-        if isinstance(publishers, str):
-            publishers = [publishers]
-        for pub in publishers:
-            if pub and pub.strip():
-                pub_id = get_or_create_reference(cursor, 'publishers', pub.strip())
-                cursor.execute("""INSERT IGNORE INTO game_publishers (app_id, publisher_id) 
-                                VALUES (%s, %s)""", (app_id, pub_id))
+        cursor.execute(GAME_UPSERT_SQL, tuple(row[column] for column in GAME_COLUMNS))
         
-        # Process categories
-        if row['Categories']:
-            for cat in row['Categories'].split(','):
-                cat = cat.strip()
-                if cat:
-                    cat_id = get_or_create_reference(cursor, 'categories', cat)
-                    cursor.execute("""INSERT IGNORE INTO game_categories (app_id, category_id) 
-                                    VALUES (%s, %s)""", (app_id, cat_id))
+        # Process developers, publishers, categories, genres and tags
+        for table, (junction_table, junction_column) in REFERENCE_TABLES.items():
+            ref_ids = [get_or_create_reference(cursor, table, name, cache) for name in row[table]]
+            added = sync_links(cursor, table, {app_id: ref_ids}, fresh_load)
+            if added:
+                cursor.executemany(f"""INSERT IGNORE INTO {junction_table} (app_id, {junction_column}) 
+                                    VALUES (%s, %s)""", added)
         
-        # Process genres
-        if row['Genres']:
-            for genre in row['Genres'].split(','):
-                genre = genre.strip()
-                if genre:
-                    genre_id = get_or_create_reference(cursor, 'genres', genre)
-                    cursor.execute("""INSERT IGNORE INTO game_genres (app_id, genre_id) 
-                                    VALUES (%s, %s)""", (app_id, genre_id))
+        # Process screenshots and movies
+        for table in MEDIA_TABLES:
+            sync_media(cursor, table, {app_id: row[table]}, fresh_load)
         
-        # Process tags
-        if row['Tags']:
-            for tag in row['Tags'].split(','):
-                tag = tag.strip()
-                if tag:
-                    tag_id = get_or_create_reference(cursor, 'tags', tag)
-                    cursor.execute("""INSERT IGNORE INTO game_tags (app_id, tag_id) 
-                                    VALUES (%s, %s)""", (app_id, tag_id))
-        
-        # Process screenshots
-        cursor.execute("DELETE FROM screenshots WHERE app_id = %s", (app_id,))
-        screenshots = safe_literal_eval(row['Screenshots'])
-        if screenshots:
-            for url in screenshots:
-                if url.strip():
-                    cursor.execute("""INSERT INTO screenshots (app_id, url) 
-                                    VALUES (%s, %s)""", (app_id, url.strip()))
-        
-        # Process movies
-        cursor.execute("DELETE FROM movies WHERE app_id = %s", (app_id,))
-        movies = safe_literal_eval(row['Movies'])
-        if isinstance(movies, str):
-            movies = [movies]
-        if movies:
-            for url in movies:
-                if url and url.strip():
-                    cursor.execute("""INSERT INTO movies (app_id, url) 
-                                    VALUES (%s, %s)""", (app_id, url.strip()))
+        if row.get('content_hash'):
+            cursor.execute(HASH_UPSERT_SQL, (app_id, row['content_hash']))
         
         return True
         
@@ -337,49 +716,366 @@ def process_game_row(cursor, row: Dict[str, Any]) -> bool:
         print(f"Error processing app_id {app_id}: {e}")
         return False
 
-def process_games_csv(file_path: str):
-    """Main function to process the games CSV file"""
-    # Read CSV file using Polars
-    df = pl.scan_csv(file_path).collect()
+def process_game_batch(cursor, batch: pl.DataFrame,
+                       cache: Optional[ReferenceCache] = None, fresh_load: bool = False):
+    """Process a batch of normalized game rows using multi-row statements.
+    
+    Raises on failure so the caller can roll back the whole batch.
+    """
+    if cache is None:
+        cache = ReferenceCache()
+        resolve_references(cursor, batch, cache)
+    
+    cursor.executemany(GAME_UPSERT_SQL, batch.select(GAME_COLUMNS).rows())
+    
+    for table, links in build_junction_frames(batch, cache).items():
+        # Links the CSV no longer lists are deleted, so a changed game doesn't keep old tags
+        added = links.rows() if fresh_load else sync_links(cursor, table, ref_ids_by_app(batch, links))
+        if not added:
+            continue
+        junction_table, junction_column = REFERENCE_TABLES[table]
+        cursor.executemany(
+            f"""INSERT IGNORE INTO {junction_table} (app_id, {junction_column}) 
+                VALUES (%s, %s)""",
+            added
+        )
+    
+    # Later rows win when an app_id repeats within the batch
+    for table in MEDIA_TABLES:
+        sync_media(cursor, table, dict(batch.select('app_id', table).rows()), fresh_load)
+    
+    if 'content_hash' in batch.columns:
+        cursor.executemany(HASH_UPSERT_SQL, batch.select('app_id', 'content_hash').rows())
+
+def process_rows(connection, cursor, rows: List[Dict[str, Any]],
+                 cache: Optional[ReferenceCache] = None, fresh_load: bool = False) -> Tuple[int, int]:
+    """Process rows one at a time, committing after each; returns (processed, errors)"""
+    processed_count = 0
+    error_count = 0
+    for row in rows:
+        try:
+            success = process_game_row(cursor, row, cache, fresh_load)
+            if success:
+                processed_count += 1
+            else:
+                error_count += 1
+            connection.commit()
+            if cache is not None:
+                cache.commit()
+        except Exception as e:
+            print(f"Error processing row: {e}")
+            error_count += 1
+            connection.rollback()
+            if cache is not None:
+                cache.rollback()
+    return processed_count, error_count
+
+def ingest_frame(connection, df: pl.DataFrame, batch_size: int, cache: ReferenceCache,
+                 on_batch: Optional[Callable[[int, int, int], None]] = None,
+                 fresh_load: bool = False) -> Tuple[int, int]:
+    """Write a normalized frame on one connection; returns (processed, errors).
+    
+    on_batch is called after every batch with (rows, processed, errors).
+    """
+    processed_count = 0
+    error_count = 0
+    with connection.cursor() as cursor:
+        for offset in range(0, len(df), batch_size):
+            batch = df.slice(offset, batch_size)
+            if batch_size == 1:
+                processed, errors = process_rows(connection, cursor, batch.to_dicts(), cache,
+                                                 fresh_load)
+            else:
+                try:
+                    process_game_batch(cursor, batch, cache, fresh_load)
+                    connection.commit()
+                    cache.commit()
+                    processed, errors = len(batch), 0
+                except Exception as e:
+                    print(f"Error processing batch at app_id {batch['app_id'][0]}: {e}")
+                    connection.rollback()
+                    cache.rollback()
+                    # Retry row by row so one bad game doesn't sink the batch
+                    processed, errors = process_rows(connection, cursor, batch.to_dicts(), cache,
+                                                     fresh_load)
+            
+            processed_count += processed
+            error_count += errors
+            if on_batch is not None:
+                on_batch(len(batch), processed, errors)
+    return processed_count, error_count
+
+def shard_by_app_id(df: pl.DataFrame, shards: int) -> List[pl.DataFrame]:
+    """Split df into contiguous app_id ranges of roughly equal size.
+    
+    Rows sharing an app_id always land in the same shard.
+    """
+    unique_ids = df['app_id'].n_unique()
+    if shards <= 1 or unique_ids <= 1:
+        return [df]
+    shard = ((pl.col('app_id').rank('dense') - 1) * shards // unique_ids).alias('shard')
+    return df.sort('app_id').with_columns(shard).partition_by('shard', include_key=False)
+
+def ingest_sharded(df: pl.DataFrame, batch_size: int, cache: ReferenceCache, workers: int,
+                   on_batch: Optional[Callable[[int, int, int], None]] = None,
+                   fresh_load: bool = False) -> Tuple[int, int]:
+    """Write app_id shards of df concurrently, one connection per worker thread.
+    
+    Reference names must already be resolved into cache so workers never
+    race each other on the UNIQUE name indexes.
+    """
+    def run_shard(shard: pl.DataFrame) -> Tuple[int, int]:
+        connection = pymysql.connect(**DB_CONFIG)
+        try:
+            return ingest_frame(connection, shard, batch_size, cache, on_batch, fresh_load)
+        finally:
+            connection.close()
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run_shard, shard_by_app_id(df, workers)))
+    return sum(result[0] for result in results), sum(result[1] for result in results)
+
+def write_tsv(df: pl.DataFrame, path: str):
+    """Write df in the default LOAD DATA format: tab separated, backslash escaped, \\N for NULL"""
+    escaped = [
+        pl.col(column).str.replace_all('\\', '\\\\', literal=True)
+        .str.replace_all('\t', '\\t', literal=True)
+        .str.replace_all('\n', '\\n', literal=True)
+        .str.replace_all('\r', '\\r', literal=True)
+        for column, dtype in df.schema.items() if dtype == pl.String
+    ]
+    df.with_columns(escaped).write_csv(path, separator='\t', include_header=False,
+                                       null_value='\\N', quote_style='never',
+                                       date_format='%Y-%m-%d', line_terminator='\n')
+
+def load_tsv(cursor, df: pl.DataFrame, table_name: str, duplicates: str = 'IGNORE') -> int:
+    """Bulk load df into table_name with LOAD DATA LOCAL INFILE; returns rows sent.
+    
+    duplicates is the LOAD DATA duplicate-key handling, IGNORE or REPLACE.
+    """
+    if df.is_empty():
+        return 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"{table_name}.tsv")
+        write_tsv(df, path)
+        cursor.execute(f"""LOAD DATA LOCAL INFILE %s {duplicates} INTO TABLE {table_name}
+                          CHARACTER SET utf8mb4 ({', '.join(df.columns)})""", (path,))
+    return len(df)
+
+def load_frame_infile(connection, df: pl.DataFrame, cache: ReferenceCache,
+                      fresh_load: bool = False) -> Dict[str, Tuple[int, float]]:
+    """Write a normalized frame with LOAD DATA LOCAL INFILE, one file per table.
+    
+    Games are loaded into a temporary staging table and upserted from there,
+    new junction rows are loaded with IGNORE once sync_links has deleted the
+    dropped ones. Links and media are diffed against the database unless
+    fresh_load says the tables started empty. Commits once at the end
+    and returns (rows, seconds) per table.
+    """
+    stats = {}
+    with connection.cursor() as cursor:
+        start = time.perf_counter()
+        games = df.select(GAME_COLUMNS)
+        if fresh_load:
+            # No foreign keys yet, so REPLACE keeps the last row of a repeated app_id
+            load_tsv(cursor, games, 'games', 'REPLACE')
+        else:
+            columns = ', '.join(GAME_COLUMNS)
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS games_stage")
+            cursor.execute("CREATE TEMPORARY TABLE games_stage AS SELECT * FROM games LIMIT 0")
+            load_tsv(cursor, games, 'games_stage')
+            cursor.execute(f"""INSERT INTO games ({columns})
+                              SELECT {columns} FROM games_stage
+                              ON DUPLICATE KEY UPDATE {', '.join(f"{k}=VALUES({k})" for k in GAME_COLUMNS)}""")
+            cursor.execute("DROP TEMPORARY TABLE games_stage")
+        stats['games'] = (len(games), time.perf_counter() - start)
+        
+        for table, links in build_junction_frames(df, cache).items():
+            junction_table, junction_column = REFERENCE_TABLES[table]
+            start = time.perf_counter()
+            if not fresh_load:
+                added = sync_links(cursor, table, ref_ids_by_app(df, links))
+                links = pl.DataFrame(added, schema={'app_id': pl.Int64, 'ref_id': pl.Int64}, orient='row')
+            rows = load_tsv(cursor, links.rename({'ref_id': junction_column}), junction_table)
+            stats[junction_table] = (rows, time.perf_counter() - start)
+        
+        for table in MEDIA_TABLES:
+            start = time.perf_counter()
+            if fresh_load:
+                urls = df.select('app_id', pl.col(table).alias('url')).explode('url').drop_nulls()
+                rows = load_tsv(cursor, urls, table)
+            else:
+                urls_by_app = dict(df.select('app_id', table).rows())
+                sync_media(cursor, table, urls_by_app)
+                rows = sum(len(urls) for urls in urls_by_app.values())
+            stats[table] = (rows, time.perf_counter() - start)
+        
+        if 'content_hash' in df.columns:
+            start = time.perf_counter()
+            rows = load_tsv(cursor, df.select('app_id', 'content_hash'), 'game_hashes', 'REPLACE')
+            stats['game_hashes'] = (rows, time.perf_counter() - start)
+    connection.commit()
+    cache.commit()
+    return stats
+
+def iter_csv_chunks(file_path: str, chunk_size: int) -> Iterator[pl.DataFrame]:
+    """Read a CSV file as DataFrames of at most chunk_size records.
+    
+    Only one chunk of raw text is held at a time. A record ends at a newline
+    once its double quotes are balanced, so quoted multi-line fields such as
+    "About the game" are never split. Every column is read as a string so
+    all chunks share one schema; normalize_games_frame does the typing.
+    """
+    with open(file_path, encoding='utf-8', newline='') as f:
+        header = f.readline()
+        lines = []
+        records = 0
+        in_quotes = False
+        for line in f:
+            lines.append(line)
+            if line.count('"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                records += 1
+                if records == chunk_size:
+                    yield pl.read_csv(io.BytesIO((header + ''.join(lines)).encode('utf-8')),
+                                      infer_schema=False)
+                    lines = []
+                    records = 0
+        if lines:
+            yield pl.read_csv(io.BytesIO((header + ''.join(lines)).encode('utf-8')),
+                              infer_schema=False)
+
+def process_games_csv(file_path: str, batch_size: int = DEFAULT_BATCH_SIZE, workers: int = 1,
+                      chunk_size: Optional[int] = None, incremental: bool = False,
+                      bulk_load: bool = False, load_mode: str = 'insert',
+                      snapshot: bool = True) -> Dict[str, Any]:
+    """Main function to process the games CSV file; returns the run's counters and timings.
+    
+    batch_size games per commit (1 = row by row), workers app_id shards,
+    chunk_size rows per streamed CSV chunk, incremental skips games whose
+    content hash is unchanged, bulk_load defers keys for an empty database,
+    load_mode picks INSERT or LOAD DATA, snapshot exports an Arrow snapshot.
+    """
+    batch_size = max(batch_size, 1)
+    
+    # Read CSV file using Polars and normalize every column in one pass
+    if chunk_size:
+        frames = (with_content_hash(normalize_games_frame(chunk))
+                  for chunk in iter_csv_chunks(file_path, chunk_size))
+        total = None
+    else:
+        df = with_content_hash(normalize_games_frame(pl.scan_csv(file_path).collect()))
+        frames = [df]
+        total = len(df)
     
     # Initialize counters
     processed_count = 0
     error_count = 0
+    unchanged_count = 0
+    written_ids = []
     
     # Create database connection
-    connection = pymysql.connect(**DB_CONFIG)
+    connection = pymysql.connect(**DB_CONFIG, local_infile=(load_mode == 'infile'))
+    cache = ReferenceCache()
+    infile_stats = {}
     
+    elapsed = 0.0
+    timings = {}
     try:
+        if bulk_load and schema_exists(connection):
+            print("Tables already exist; bulk load needs an empty database, loading normally")
+            bulk_load = False
+        
         # Create schema
         print("Creating database schema...")
-        create_database_schema(connection)
+        phase_start = time.perf_counter()
+        create_database_schema(connection, deferred_keys=bulk_load)
+        if not bulk_load:
+            # Databases created before the search indexes, ranking columns or later keys get them here
+            ensure_search_indexes(connection)
+            ensure_summary_columns(connection)
+            ensure_schema_keys(connection)
+        timings['schema'] = time.perf_counter() - phase_start
         
         # Process games
         print("Processing games...")
+        start_time = time.perf_counter()
         with connection.cursor() as cursor:
-            # Create progress bar
-            pbar = tqdm(total=len(df), desc="Processing games")
+            cache.preload(cursor)
+        
+        # Create progress bar
+        pbar = tqdm(total=total, desc="Processing games")
+        progress_lock = threading.Lock()
+        
+        def on_batch(rows: int, processed: int, errors: int):
+            nonlocal processed_count, error_count
+            with progress_lock:
+                processed_count += processed
+                error_count += errors
+                pbar.update(rows)
+                pbar.set_postfix({
+                    'Processed': processed_count,
+                    'Errors': error_count
+                })
+        
+        for df in frames:
+            with connection.cursor() as cursor:
+                if incremental:
+                    changed = filter_changed_games(cursor, df)
+                    unchanged_count += len(df) - len(changed)
+                    on_batch(len(df) - len(changed), 0, 0)
+                    df = changed
+                
+                # Create all new reference names up front in one pass
+                resolve_references(cursor, df, cache)
+                connection.commit()
+                cache.commit()
             
-            for row in df.iter_rows(named=True):
+            if load_mode == 'infile':
                 try:
-                    success = process_game_row(cursor, row)
-                    if success:
-                        processed_count += 1
-                    else:
-                        error_count += 1
-                    connection.commit()
+                    for table, (rows, seconds) in load_frame_infile(connection, df, cache,
+                                                                    bulk_load).items():
+                        total_rows, total_seconds = infile_stats.get(table, (0, 0.0))
+                        infile_stats[table] = (total_rows + rows, total_seconds + seconds)
+                    on_batch(len(df), len(df), 0)
+                    written_ids.extend(df['app_id'].to_list())
+                    invalidate_games(df['app_id'].to_list())
+                    continue
                 except Exception as e:
-                    print(f"Error processing row: {e}")
-                    error_count += 1
+                    print(f"LOAD DATA failed ({e}); falling back to INSERT statements")
                     connection.rollback()
-                finally:
-                    pbar.update(1)
-                    pbar.set_postfix({
-                        'Processed': processed_count,
-                        'Errors': error_count
-                    })
+                    cache.rollback()
             
-            pbar.close()
+            if workers > 1:
+                ingest_sharded(df, batch_size, cache, workers, on_batch, bulk_load)
+            else:
+                ingest_frame(connection, df, batch_size, cache, on_batch, bulk_load)
+            written_ids.extend(df['app_id'].to_list())
+            # Written games must not be served from a cache in this process
+            invalidate_games(df['app_id'].to_list())
+        
+        pbar.close()
+        elapsed = time.perf_counter() - start_time
+        timings['load'] = elapsed
+        
+        if bulk_load:
+            print("Building deferred indexes and foreign keys...")
+            phase_start = time.perf_counter()
+            build_deferred_keys(connection)
+            timings['keys'] = time.perf_counter() - phase_start
+        
+        print("Refreshing game summary...")
+        phase_start = time.perf_counter()
+        refresh_game_summary(connection, written_ids if incremental else None)
+        timings['summary'] = time.perf_counter() - phase_start
+        
+        # A run that wrote nothing leaves the catalog, and so the latest snapshot, as it was
+        if snapshot and (written_ids or latest_snapshot() is None):
+            print("Exporting catalog snapshot...")
+            phase_start = time.perf_counter()
+            print(f"Snapshot written to {export_snapshot(connection)}")
+            timings['snapshot'] = time.perf_counter() - phase_start
             
     except Exception as e:
         print(f"Error during processing: {e}")
@@ -389,6 +1085,142 @@ def process_games_csv(file_path: str):
     print("\nProcessing completed!")
     print(f"Total games processed: {processed_count}")
     print(f"Errors encountered: {error_count}")
+    if incremental:
+        print(f"Unchanged games skipped: {unchanged_count}")
+    if elapsed > 0:
+        print(f"Throughput ({load_mode}): {processed_count / elapsed:.1f} rows/sec ({elapsed:.1f}s)")
+    for table, (rows, seconds) in infile_stats.items():
+        rate = rows / seconds if seconds > 0 else 0.0
+        print(f"  LOAD DATA {table}: {rows} rows in {seconds:.2f}s ({rate:.0f} rows/sec)")
+    if timings:
+        print("Phase timings: " + ", ".join(f"{phase} {seconds:.1f}s"
+                                            for phase, seconds in timings.items()))
+    cache_stats = cache.stats()
+    print(f"Reference cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+          f"({cache_stats['hit_rate']:.1%} hit rate, {cache_stats['size']} names)")
+    
+    return {
+        'processed': processed_count,
+        'errors': error_count,
+        'unchanged': unchanged_count,
+        'elapsed': elapsed,
+        'timings': timings,
+    }
+
+def drop_schema_tables():
+    """Drop every SCHEMA_TABLES table in the DB_CONFIG database"""
+    connection = pymysql.connect(**DB_CONFIG)
+    try:
+        with connection.cursor() as cursor:
+            # Junction tables reference games and the reference tables
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            for table in SCHEMA_TABLES:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        connection.commit()
+    finally:
+        connection.close()
+
+def benchmark_load_paths(file_path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                         drop_tables: bool = False):
+    """Load the file with INSERT statements and with LOAD DATA and compare throughput.
+    
+    The ingest tables are dropped before each run, so both load into an
+    empty schema. Nothing runs unless drop_tables confirms that DB_CONFIG
+    points at a scratch database.
+    """
+    if not drop_tables:
+        print(f"Refusing to benchmark: it drops every ingest table in {DB_CONFIG['db']} on "
+              f"{DB_CONFIG['host']}. Point --db-host/--db-name at a scratch database and pass "
+              f"--i-know-this-drops-tables.")
+        return
+    results = {}
+    for mode in ('insert', 'infile'):
+        print(f"Dropping the ingest tables before the {mode} run...")
+        drop_schema_tables()
+        results[mode] = process_games_csv(file_path, batch_size=batch_size, load_mode=mode,
+                                          snapshot=False)
+    print("\nLoad path comparison:")
+    for mode, result in results.items():
+        rate = result['processed'] / result['elapsed'] if result['elapsed'] > 0 else 0.0
+        print(f"  {mode:<7} {result['processed']} games in {result['elapsed']:.2f}s ({rate:.0f} rows/sec)")
+
+def benchmark_normalization(file_path: str, repeat: int = 3):
+    """Compare vectorized normalization with the old per-row parsing"""
+    raw = pl.scan_csv(file_path).collect()
+    
+    def parse_rows():
+        for row in raw.iter_rows(named=True):
+            {
+                'release_date': pl.from_pandas(pd.to_datetime([row['Release date']])).dt.date()[0] if row['Release date'] else None,
+                'price': float(row['Price']) if row['Price'] else 0.0,
+                'supported_languages': json.dumps(safe_literal_eval(row['Supported languages'])),
+                'full_audio_languages': json.dumps(safe_literal_eval(row['Full audio languages'])),
+                'windows': 1 if row['Windows'] else 0,
+                'mac': 1 if row['Mac'] else 0,
+                'linux': 1 if row['Linux'] else 0,
+            }
+            for column in ('Developers', 'Publishers', 'Screenshots', 'Movies'):
+                safe_literal_eval(row[column])
+            for column in ('Categories', 'Genres', 'Tags'):
+                [value.strip() for value in row[column].split(',')] if row[column] else []
+    
+    def best_of(func) -> float:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+    
+    per_row = best_of(parse_rows)
+    vectorized = best_of(lambda: normalize_games_frame(raw).to_dicts())
+    print(f"Normalization of {len(raw)} rows (best of {repeat}):")
+    print(f"  per-row parsing: {per_row * 1000:.1f} ms ({len(raw) / per_row:.0f} rows/sec)")
+    print(f"  vectorized:      {vectorized * 1000:.1f} ms ({len(raw) / vectorized:.0f} rows/sec)")
+    print(f"  speedup:         {per_row / vectorized:.1f}x")
 
 if __name__ == "__main__":
-    process_games_csv('top_250_by_Positive.csv')  # Replace with your CSV file path
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load the games CSV into MySQL")
+    parser.add_argument('file_path', nargs='?', default='top_250_by_Positive.csv')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="games per multi-row batch and commit (1 = row by row)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="parallel connections, each loading its own app_id range")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help="stream the CSV in chunks of this many rows instead of loading it whole")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only write games whose content changed since the last run")
+    parser.add_argument('--bulk-load', action='store_true',
+                        help="first load into an empty database: add indexes and foreign keys last")
+    parser.add_argument('--load-mode', choices=['insert', 'infile'], default='insert',
+                        help="send rows as INSERT statements or LOAD DATA LOCAL INFILE files")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="benchmark CSV normalization instead of loading")
+    parser.add_argument('--benchmark-load', action='store_true',
+                        help="load with both --load-mode paths and compare throughput; "
+                             "drops the ingest tables first, so use a scratch database")
+    parser.add_argument('--i-know-this-drops-tables', dest='drop_tables', action='store_true',
+                        help="confirm that --benchmark-load may drop the ingest tables")
+    parser.add_argument('--no-snapshot', dest='snapshot', action='store_false',
+                        help="skip exporting the Arrow catalog snapshot after the load")
+    parser.add_argument('--db-host', help="override the database host, e.g. a local MySQL")
+    parser.add_argument('--db-port', type=int, help="override the database port")
+    parser.add_argument('--db-user', help="override the database user")
+    parser.add_argument('--db-password', help="override the database password")
+    parser.add_argument('--db-name', help="override the database name")
+    args = parser.parse_args()
+    
+    overrides = {'host': args.db_host, 'port': args.db_port, 'user': args.db_user,
+                 'password': args.db_password, 'db': args.db_name}
+    DB_CONFIG.update({key: value for key, value in overrides.items() if value is not None})
+    
+    if args.benchmark:
+        benchmark_normalization(args.file_path)
+    elif args.benchmark_load:
+        benchmark_load_paths(args.file_path, batch_size=args.batch_size, drop_tables=args.drop_tables)
+    else:
+        process_games_csv(args.file_path, batch_size=args.batch_size, workers=args.workers,
+                          chunk_size=args.chunk_size, incremental=args.incremental,
+                          bulk_load=args.bulk_load, load_mode=args.load_mode,
+                          snapshot=args.snapshot)
\ No newline at end of file
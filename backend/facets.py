@@ -0,0 +1,227 @@
+from typing import Dict, Any, List, Optional, Iterable, Union
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+import argparse
+import threading
+import time
+import numpy as np
+from read import DatabaseOperations, REFERENCE_TABLES, FACET_TABLES, PLATFORMS, FACETS, uncached_db_ops
+from changes import Debouncer, subscribe
+
+# A value held by fewer than 1 in SPARSE_RATIO games is stored as sorted positions instead of a
+# bitset: 4 bytes per game against one bit for every game
+SPARSE_RATIO = 32
+
+def bitset(positions: Iterable[int], size: int) -> int:
+    """Python int with bit p set for every position p"""
+    flags = np.zeros(size, dtype=bool)
+    flags[np.fromiter(positions, dtype=np.int64)] = True
+    return int.from_bytes(np.packbits(flags, bitorder='little').tobytes(), 'little')
+
+def bit_range(start: int, stop: int) -> int:
+    """Bits start..stop-1 set"""
+    return ((1 << stop) - 1) ^ ((1 << start) - 1) if stop > start else 0
+
+def bit_flags(bits: int, size: int) -> np.ndarray:
+    """Boolean array of length size, True at every set bit"""
+    packed = np.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(packed, count=size, bitorder='little').view(bool)
+
+def bit_positions(bits: int, size: int) -> np.ndarray:
+    """Positions of the set bits, lowest first"""
+    return np.flatnonzero(bit_flags(bits, size))
+
+def members(positions: List[int], size: int) -> Union[int, np.ndarray]:
+    """A value's games as a bitset if it is dense, else as a sorted position array"""
+    if len(positions) * SPARSE_RATIO >= size:
+        return bitset(positions, size)
+    return np.sort(np.array(positions, dtype=np.int32))
+
+class FacetIndex:
+    """In-memory bitmap index over genres, tags, categories, developers and platforms.
+
+    Games are numbered by ascending price (then app_id, as in the SQL
+    fallback), so a price range is a contiguous run of positions. A common
+    value (a platform, most genres and tags) is a Python int with one bit
+    per game; a rare one (most developers) is a sorted array of positions,
+    see SPARSE_RATIO. A filter ANDs the bitsets, intersects the arrays and
+    keeps the positions whose bit survived. Facet counts come from a CSR
+    array of each game's value codes: the matched games' codes are gathered
+    and tallied with one np.bincount. Values within a facet are ANDed too,
+    since a game has many genres and tags ("Indie + RPG" means both).
+
+    Once attached, writes reported through cache.invalidate_games mark the
+    index stale and schedule a rebuild; search_games falls back to SQL while
+    it is stale.
+    """
+    def __init__(self, db_ops: Optional[DatabaseOperations] = None, rebuild_delay: float = 5.0):
+        self.db_ops = db_ops or uncached_db_ops()
+        self.rebuild_delay = rebuild_delay
+        self.app_ids: List[int] = []
+        self.prices: List[float] = []  # ascending, priced games only
+        self.all_bits = 0
+        self.values: Dict[str, Dict[str, Union[int, np.ndarray]]] = {facet: {} for facet in FACETS}
+        # Every (facet, value) has a code; game p's codes are codes[offsets[p]:offsets[p + 1]]
+        self.code_values: List[tuple] = []
+        self.codes = np.zeros(0, dtype=np.int32)
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.stale = True
+        self._writes = 0  # bumped by every reported write, so a load racing one stays stale
+        self._debouncer = Debouncer(rebuild_delay, self._rebuild)
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Build every bitset and position array from the games and junction tables"""
+        writes = self._writes
+        with self.db_ops._connection() as connection, connection.cursor() as cursor:
+            # NULL prices sort last so priced games form a prefix of the positions
+            cursor.execute("""SELECT app_id, price, windows, mac, linux FROM games
+                              ORDER BY price IS NULL, price, app_id""")
+            games = cursor.fetchall()
+            positions = {row['app_id']: position for position, row in enumerate(games)}
+            size = len(games)
+
+            game_codes = [[code for code, platform in enumerate(PLATFORMS) if row[platform]]
+                          for row in games]
+            code_values = [('platforms', platform) for platform in PLATFORMS]
+            values = {'platforms': {
+                platform: members([p for p, row in enumerate(games) if row[platform]], size)
+                for platform in PLATFORMS
+            }}
+            for facet in FACET_TABLES:
+                junction, column = REFERENCE_TABLES[facet]
+                cursor.execute(f"SELECT j.app_id, r.name FROM {junction} j JOIN {facet} r ON r.id = j.{column}")
+                games_by_name: Dict[str, List[int]] = {}
+                for row in cursor.fetchall():
+                    position = positions.get(row['app_id'])
+                    if position is not None:
+                        games_by_name.setdefault(row['name'], []).append(position)
+                values[facet] = {}
+                for name, found in games_by_name.items():
+                    values[facet][name] = members(found, size)
+                    for position in found:
+                        game_codes[position].append(len(code_values))
+                    code_values.append((facet, name))
+
+        with self._lock:
+            self.app_ids = [row['app_id'] for row in games]
+            self.prices = [float(row['price']) for row in games if row['price'] is not None]
+            self.all_bits = bit_range(0, size)
+            self.values = values
+            self.code_values = code_values
+            self.codes = np.fromiter((code for found in game_codes for code in found), dtype=np.int32)
+            self.offsets = np.concatenate(([0], np.cumsum([len(found) for found in game_codes])))
+            self.stale = writes != self._writes
+        return self
+
+    def attach(self, poll_interval: Optional[float] = 30.0):
+        """Rebuild rebuild_delay seconds after the last reported write (see changes.subscribe)"""
+        subscribe(self._on_write, self.db_ops, poll_interval)
+        return self
+
+    def _on_write(self, app_ids: List[int]):
+        with self._lock:
+            self.stale = True
+            self._writes += 1
+        self._debouncer.trigger()
+
+    def _rebuild(self):
+        try:
+            self.load()
+        except Exception as e:
+            print(f"Error rebuilding facet index: {e}")
+
+    def supports(self, filters: Dict[str, Any]) -> bool:
+        """Whether every filter can be answered from the index"""
+        return not self.stale and all(key in FACETS or key in ('min_price', 'max_price')
+                                      for key in filters)
+
+    def match(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Positions of the games matching every facet value and the price bounds, cheapest first"""
+        size = len(self.app_ids)
+        bits = self.all_bits
+        sparse = None
+        if 'min_price' in filters or 'max_price' in filters:
+            start = bisect_left(self.prices, float(filters.get('min_price', float('-inf'))))
+            stop = bisect_right(self.prices, float(filters.get('max_price', float('inf'))))
+            bits &= bit_range(start, stop)
+        for facet in FACETS:
+            for value in filters.get(facet, ()):
+                found = self.values[facet].get(value)
+                if found is None:
+                    return np.zeros(0, dtype=np.int64)
+                if isinstance(found, int):
+                    bits &= found
+                else:
+                    sparse = found if sparse is None else np.intersect1d(sparse, found, assume_unique=True)
+        if sparse is None:
+            return bit_positions(bits, size)
+        return sparse[bit_flags(bits, size)[sparse]]
+
+    def counts(self, positions: np.ndarray) -> Dict[str, Dict[str, int]]:
+        """Per facet, how many of the matched games have each value (non-zero, largest first)"""
+        starts = self.offsets[positions]
+        lengths = self.offsets[positions + 1] - starts
+        # Index of every code belonging to a matched game, without a Python loop
+        index = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        tally = np.bincount(self.codes[index], minlength=len(self.code_values))
+
+        counts = {facet: {} for facet in FACETS}
+        for code in np.flatnonzero(tally):
+            facet, value = self.code_values[code]
+            counts[facet][value] = int(tally[code])
+        return {facet: dict(sorted(found.items(), key=lambda item: (-item[1], item[0])))
+                for facet, found in counts.items()}
+
+    def search(self, filters: Dict[str, Any], limit: int = 10,
+               with_counts: bool = True) -> Dict[str, Any]:
+        """Matching app_ids (cheapest first), the total, and optionally the facet counts"""
+        with self._lock:
+            positions = self.match(filters)
+            app_ids = [self.app_ids[position] for position in positions[:limit]]
+            result = {'app_ids': app_ids, 'total': len(positions)}
+            if with_counts:
+                result['counts'] = self.counts(positions)
+            return result
+
+def benchmark_facets(index: FacetIndex, filters: Dict[str, Any], repeat: int = 100):
+    """Time an in-memory faceted search against the equivalent SQL EXISTS query"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = index.search(filters)
+    memory = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(max(repeat // 10, 1)):
+        index.db_ops.search_games(filters, limit=10)
+    sql = (time.perf_counter() - start) / max(repeat // 10, 1)
+    print(f"{filters}: {result['total']} games; index {memory * 1000:.2f} ms with counts, "
+          f"SQL {sql * 1000:.1f} ms without")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Faceted game search from in-memory bitsets")
+    parser.add_argument('--genre', action='append', default=[], dest='genres')
+    parser.add_argument('--tag', action='append', default=[], dest='tags')
+    parser.add_argument('--category', action='append', default=[], dest='categories')
+    parser.add_argument('--developer', action='append', default=[], dest='developers')
+    parser.add_argument('--platform', action='append', default=[], dest='platforms', choices=PLATFORMS)
+    parser.add_argument('--min-price', type=Decimal)
+    parser.add_argument('--max-price', type=Decimal)
+    parser.add_argument('--benchmark', action='store_true', help="Compare against the SQL query")
+    args = parser.parse_args()
+
+    filters = {facet: getattr(args, facet) for facet in FACETS if getattr(args, facet)}
+    if args.min_price is not None:
+        filters['min_price'] = args.min_price
+    if args.max_price is not None:
+        filters['max_price'] = args.max_price
+
+    start = time.perf_counter()
+    index = FacetIndex().load()
+    print(f"Indexed {len(index.app_ids)} games in {time.perf_counter() - start:.2f}s")
+    result = index.search(filters)
+    print(f"{result['total']} matching games, first {len(result['app_ids'])}: {result['app_ids']}")
+    for facet, counts in result['counts'].items():
+        print(f"{facet}: " + ", ".join(f"{value} ({count})" for value, count in list(counts.items())[:10]))
+    if args.benchmark:
+        benchmark_facets(index, filters)
@@ -0,0 +1,197 @@
+import pymysql
+from pymysql.constants import SERVER_STATUS
+from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from collections import deque
+import threading
+import time
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the timeout"""
+
+class ConnectionPool:
+    """Thread-safe pool of pymysql connections.
+
+    Idle connections are handed out most recently used first so they stay
+    warm. A connection idle for longer than health_check_interval is pinged
+    before reuse, and idle connections beyond min_size are closed after
+    max_idle seconds. min_size connections are opened up front.
+
+    Connections run in autocommit mode, so a read leaves no transaction to
+    roll back on release; writers call connection.begin() first.
+    """
+    def __init__(self, config: Dict[str, Any], min_size: int = 1, max_size: int = 10,
+                 timeout: float = 10.0, max_idle: float = 300.0,
+                 health_check_interval: float = 30.0):
+        self.config = config
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        # Metrics
+        self.checkouts = 0
+        self.created = 0
+        self.evicted = 0
+        self.failed_health_checks = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+        for _ in range(min(min_size, self.max_size)):
+            try:
+                connection = self._connect()
+            except Exception as e:
+                # acquire() connects on demand, so a database that is down now is not fatal
+                print(f"Error opening pooled connection: {e}")
+                break
+            self._idle.append((connection, time.monotonic()))
+            self._size += 1
+
+    def _evict_idle(self, now: float):
+        """Close idle connections past max_idle, keeping at least min_size open"""
+        while self._idle and self._size > self.min_size:
+            connection, last_used = self._idle[0]
+            if now - last_used < self.max_idle:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self.evicted += 1
+            self._close_quietly(connection)
+
+    def _close_quietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _connect(self):
+        connection = pymysql.connect(**{**self.config, 'autocommit': True})
+        with self._condition:
+            self.created += 1
+        return connection
+
+    def _discard(self):
+        """Give up the slot of a connection that is broken or closed"""
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Check out a connection, waiting up to timeout seconds for one"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+                now = time.monotonic()
+                self._evict_idle(now)
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection, last_used = None, now
+                    break
+                if now >= deadline:
+                    self.timeouts += 1
+                    raise PoolTimeout(f"No connection available within {timeout:.1f}s")
+                self._condition.wait(deadline - now)
+
+            wait = time.monotonic() - start
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+        try:
+            if connection is None:
+                return self._connect()
+            if time.monotonic() - last_used >= self.health_check_interval:
+                try:
+                    connection.ping(reconnect=False)
+                except Exception:
+                    with self._condition:
+                        self.failed_health_checks += 1
+                    self._close_quietly(connection)
+                    return self._connect()
+            return connection
+        except Exception:
+            self._discard()
+            raise
+
+    def release(self, connection):
+        """Return a connection, ending any transaction left open on it"""
+        try:
+            if connection.open and connection.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                # A writer that began a transaction and neither committed nor rolled back
+                connection.rollback()
+            healthy = connection.open
+        except Exception:
+            healthy = False
+
+        if not healthy:
+            self._close_quietly(connection)
+            self._discard()
+            return
+
+        with self._condition:
+            if self._closed:
+                self._size -= 1
+                self._close_quietly(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Borrow a connection for the duration of a with block"""
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """Close all idle connections; checked out ones are closed on release"""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                connection, _ = self._idle.pop()
+                self._size -= 1
+                self._close_quietly(connection)
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'checkouts': self.checkouts,
+                'created': self.created,
+                'evicted': self.evicted,
+                'failed_health_checks': self.failed_health_checks,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                'max_wait_ms': self.max_wait * 1000,
+            }
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(config: Dict[str, Any], **options) -> ConnectionPool:
+    """Shared pool for a database configuration, created on first use"""
+    key = tuple(sorted((k, repr(v)) for k, v in config.items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(config, **options)
+        return _pools[key]
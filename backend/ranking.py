@@ -0,0 +1,175 @@
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from bisect import bisect_left, insort
+import argparse
+import threading
+import time
+from read import DatabaseOperations, PLATFORMS, fetch_in, uncached_db_ops
+from summary import decode_summary
+from changes import RELOAD_FRACTION, subscribe
+
+# Ranking metric -> game_summary column, each precomputed by refresh_game_summary and indexed
+METRICS = {
+    'positive_reviews': 'positive_reviews',
+    'review_ratio': 'review_percentage',
+    'wilson': 'wilson_score',
+    'playtime': 'average_playtime_hours',
+}
+
+def matches(row: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Whether a game_summary row passes the top_games filters"""
+    for platform in filters.get('platforms', ()):
+        if not row[platform]:
+            return False
+    if 'min_price' in filters and (row['price'] is None or row['price'] < filters['min_price']):
+        return False
+    if 'max_price' in filters and (row['price'] is None or row['price'] > filters['max_price']):
+        return False
+    if 'min_reviews' in filters and \
+            (row['positive_reviews'] or 0) + (row['negative_reviews'] or 0) < filters['min_reviews']:
+        return False
+    for facet in ('genres', 'developers'):
+        if any(value not in row[facet] for value in filters.get(facet, ())):
+            return False
+    return True
+
+class Leaderboard:
+    """In-memory rankings of game_summary by every metric in METRICS.
+
+    Each metric is a sorted list of (-score, app_id), so the top k is the
+    first k entries; a filter walks the list until k games pass. Games
+    with a NULL score are left out of that metric. Once attached, the
+    games passed to cache.invalidate_games are re-read from game_summary
+    and moved to their new places, so update_game changing review counts
+    is reflected without a reload.
+    """
+    def __init__(self, db_ops: Optional[DatabaseOperations] = None):
+        self.db_ops = db_ops or uncached_db_ops()
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._rankings: Dict[str, List[Tuple[float, int]]] = {metric: [] for metric in METRICS}
+        self._lock = threading.Lock()
+
+    def _fetch(self, app_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM game_summary"
+        with self.db_ops._connection() as connection, connection.cursor() as cursor:
+            if app_ids is None:
+                cursor.execute(query)
+                rows = cursor.fetchall()
+            else:
+                rows = fetch_in(cursor, query + " WHERE app_id IN ({ids})", app_ids)
+            return [decode_summary(row) for row in rows]
+
+    @staticmethod
+    def _entry(row: Dict[str, Any], column: str) -> Optional[Tuple[float, int]]:
+        score = row[column]
+        return (-float(score), row['app_id']) if score is not None else None
+
+    def load(self, rows: Optional[List[Dict[str, Any]]] = None):
+        """Rank every game_summary row (or the given rows)"""
+        rows = self._fetch() if rows is None else rows
+        rankings = {metric: sorted(entry for entry in (self._entry(row, column) for row in rows)
+                                   if entry is not None)
+                    for metric, column in METRICS.items()}
+        with self._lock:
+            self._rows = {row['app_id']: row for row in rows}
+            self._rankings = rankings
+        return self
+
+    def refresh(self, app_ids: Iterable[int]):
+        """Re-rank the given games from game_summary; deleted games are dropped"""
+        app_ids = list(dict.fromkeys(app_ids))
+        if len(app_ids) > RELOAD_FRACTION * len(self._rows):
+            self.load()
+            return
+        fresh = {row['app_id']: row for row in self._fetch(app_ids)}
+        with self._lock:
+            for app_id in app_ids:
+                old = self._rows.pop(app_id, None)
+                new = fresh.get(app_id)
+                for metric, column in METRICS.items():
+                    ranking = self._rankings[metric]
+                    if old is not None:
+                        entry = self._entry(old, column)
+                        if entry is not None:
+                            index = bisect_left(ranking, entry)
+                            if index < len(ranking) and ranking[index] == entry:
+                                del ranking[index]
+                    if new is not None:
+                        entry = self._entry(new, column)
+                        if entry is not None:
+                            insort(ranking, entry)
+                if new is not None:
+                    self._rows[app_id] = new
+
+    def attach(self, poll_interval: Optional[float] = 30.0):
+        """Re-rank the games of every reported write (see changes.subscribe)"""
+        subscribe(self.refresh, self.db_ops, poll_interval)
+        return self
+
+    def top_games(self, metric: str = 'wilson', k: int = 10,
+                  filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """The k best game_summary rows by metric, best first, ties by app_id.
+
+        filters takes 'platforms', 'min_price', 'max_price', 'min_reviews'
+        (positive plus negative), 'genres' and 'developers' (lists that must
+        all match). Without filters this is a slice of the first k entries.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric {metric!r}; use one of {list(METRICS)}")
+        filters = filters or {}
+        for platform in filters.get('platforms', ()):
+            if platform not in PLATFORMS:
+                raise ValueError(f"Unknown platform {platform!r}")
+        with self._lock:
+            ranking = self._rankings[metric]
+            if not filters:
+                return [self._rows[app_id] for _, app_id in ranking[:k]]
+            found = []
+            for _, app_id in ranking:
+                if len(found) >= k:
+                    break
+                row = self._rows[app_id]
+                if matches(row, filters):
+                    found.append(row)
+            return found
+
+def benchmark_ranking(leaderboard: Leaderboard, k: int = 10, repeat: int = 100):
+    """Time top_games from memory against the equivalent indexed game_summary query"""
+    for metric, column in METRICS.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            leaderboard.top_games(metric, k)
+        memory = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(max(repeat // 10, 1)):
+            leaderboard.db_ops.browse_games(order_by=column, page_size=k)
+        sql = (time.perf_counter() - start) / max(repeat // 10, 1)
+        print(f"{metric}: memory {memory * 1e6:.0f} us, SQL ({column} index) {sql * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Top games by positive reviews, review ratio, Wilson score or playtime")
+    parser.add_argument('metric', nargs='?', default='wilson', choices=list(METRICS))
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--platform', action='append', default=[], dest='platforms', choices=PLATFORMS)
+    parser.add_argument('--genre', action='append', default=[], dest='genres')
+    parser.add_argument('--min-reviews', type=int)
+    parser.add_argument('--max-price', type=float)
+    parser.add_argument('--benchmark', action='store_true', help="Compare against the SQL query")
+    args = parser.parse_args()
+
+    filters = {}
+    for key in ('platforms', 'genres'):
+        if getattr(args, key):
+            filters[key] = getattr(args, key)
+    if args.min_reviews is not None:
+        filters['min_reviews'] = args.min_reviews
+    if args.max_price is not None:
+        filters['max_price'] = args.max_price
+
+    start = time.perf_counter()
+    leaderboard = Leaderboard().load()
+    print(f"Ranked {len(leaderboard._rows)} games in {time.perf_counter() - start:.2f}s")
+    for rank, row in enumerate(leaderboard.top_games(args.metric, args.k, filters), 1):
+        print(f"{rank:3}. {row['name']} ({row[METRICS[args.metric]]})")
+    if args.benchmark:
+        benchmark_ranking(leaderboard, args.k)
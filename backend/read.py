@@ -1,5 +1,18 @@
 import pymysql
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Callable, Tuple, Hashable
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from decimal import Decimal
+import argparse
+import base64
+import datetime
+import json
+import re
+import time
+from pool import ConnectionPool, get_pool
+from cache import LRUCache, MISSING, CATALOG_TAG, register
+from changes import watch
+from summary import decode_summary
 
 # Database configuration
 DB_CONFIG = {
@@ -15,27 +28,615 @@ DB_CONFIG = {
     "write_timeout": 10,
 }
 
+# Upper bound on ids per IN (...) list, keeps packets well under max_allowed_packet
+IN_CLAUSE_CHUNK = 1000
+
+# Reference tables and how they link to games: table -> (junction table, id column)
+REFERENCE_TABLES = {
+    'developers': ('game_developers', 'developer_id'),
+    'publishers': ('game_publishers', 'publisher_id'),
+    'categories': ('game_categories', 'category_id'),
+    'genres': ('game_genres', 'genre_id'),
+    'tags': ('game_tags', 'tag_id'),
+}
+MEDIA_TABLES = ['screenshots', 'movies']
+
+# Faceted search filters: reference tables matched by name, plus the platform flags
+FACET_TABLES = ['genres', 'tags', 'categories', 'developers']
+PLATFORMS = ['windows', 'mac', 'linux']
+FACETS = FACET_TABLES + ['platforms']
+
+# Shared read-through cache for game rows and details; writers invalidate it
+# through cache.invalidate_games, and the TTL bounds staleness from other processes
+GAME_CACHE = register(LRUCache(max_entries=5000, max_bytes=64 * 1024 * 1024, ttl=300.0))
+
+# Columns iter_games can seek on; each has an index whose entries end in app_id
+PAGE_ORDER_COLUMNS = ['app_id', 'release_date', 'price', 'metacritic_score']
+SUMMARY_ORDER_COLUMNS = PAGE_ORDER_COLUMNS + ['positive_reviews', 'review_percentage',
+                                              'wilson_score', 'average_playtime_hours']
+
+def encode_cursor(order_by: str, descending: bool, row: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past row in the given ordering"""
+    value = row[order_by]
+    if isinstance(value, (datetime.date, Decimal)):
+        value = str(value)
+    payload = json.dumps([order_by, descending, value, row['app_id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str, order_by: str, descending: bool) -> Tuple[Any, int]:
+    """Return (value, app_id) from a cursor, checking it belongs to this ordering"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_order, cursor_desc, value, app_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise ValueError("Invalid page cursor")
+    if cursor_order != order_by or cursor_desc != descending:
+        issued = 'descending' if cursor_desc else 'ascending'
+        requested = 'descending' if descending else 'ascending'
+        raise ValueError(f"Cursor was issued for order {cursor_order!r} {issued}, "
+                         f"not {order_by!r} {requested}")
+    return value, app_id
+
+def seek_condition(order_by: str, descending: bool, value: Any, app_id: int) -> Tuple[str, List[Any]]:
+    """WHERE clause selecting rows after (value, app_id) in ORDER BY order_by, app_id.
+
+    MySQL sorts NULLs first ascending and last descending, so NULL values
+    are handled explicitly on either side of the non-NULL range.
+    """
+    op = '<' if descending else '>'
+    if order_by == 'app_id':
+        return f"app_id {op} %s", [app_id]
+    if value is None:
+        tie = f"({order_by} IS NULL AND app_id {op} %s)"
+        return (tie, [app_id]) if descending else (f"({tie} OR {order_by} IS NOT NULL)", [app_id])
+    condition = f"({order_by} {op} %s OR ({order_by} = %s AND app_id {op} %s)"
+    condition += f" OR {order_by} IS NULL)" if descending else ")"
+    return condition, [value, value, app_id]
+
+# Words shorter than innodb_ft_min_token_size are not in the FULLTEXT index
+FT_MIN_TOKEN_SIZE = 3
+# InnoDB's default stopword list (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD); these are not
+# indexed either, so a required +the* matches nothing
+FT_STOPWORDS = frozenset([
+    'a', 'about', 'an', 'are', 'as', 'at', 'be', 'by', 'com', 'de', 'en', 'for', 'from', 'how',
+    'i', 'in', 'is', 'it', 'la', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'what',
+    'when', 'where', 'who', 'will', 'with', 'und', 'www',
+])
+# Terms for --benchmark-search when none are given; 'The Forest' starts with a stopword
+BENCHMARK_TERMS = ['counter', 'The Forest', 'Call of Duty', 'simulator', 'zombie']
+
+def fulltext_words(text: str) -> List[str]:
+    """The words of text that are in the FULLTEXT index: long enough and not stopwords.
+
+    Operator characters in user input are dropped rather than interpreted.
+    """
+    return [word for word in re.findall(r'\w+', text)
+            if len(word) >= FT_MIN_TOKEN_SIZE and word.lower() not in FT_STOPWORDS]
+
+def fulltext_query(text: str) -> Optional[str]:
+    """BOOLEAN MODE query requiring every fulltext_words word of text, each as a prefix.
+
+    Returns None when no word is indexable; callers fall back to like_prefix.
+    """
+    words = fulltext_words(text)
+    if not words:
+        return None
+    return ' '.join(f'+{word}*' for word in words)
+
+def like_prefix(text: str) -> str:
+    """LIKE pattern matching names that start with text, which can use idx_name"""
+    return re.sub(r'([\\%_])', r'\\\1', text) + '%'
+
+# Every games column, and the ones large enough to leave out of list views
+GAME_COLUMNS = [
+    'app_id', 'name', 'release_date', 'estimated_owners', 'peak_ccu', 'required_age', 'price',
+    'dlc_count', 'about_the_game', 'supported_languages', 'full_audio_languages', 'reviews',
+    'header_image', 'website', 'support_url', 'support_email', 'windows', 'mac', 'linux',
+    'metacritic_score', 'metacritic_url', 'user_score', 'positive_reviews', 'negative_reviews',
+    'score_rank', 'achievements', 'recommendations', 'notes', 'average_playtime_forever',
+    'average_playtime_two_weeks', 'median_playtime_forever', 'median_playtime_two_weeks',
+]
+LARGE_COLUMNS = ['about_the_game', 'supported_languages', 'full_audio_languages', 'reviews', 'notes']
+
+# Named projections; None selects every column
+PROJECTIONS = {
+    'card': ['app_id', 'name', 'price', 'header_image', 'release_date', 'windows', 'mac', 'linux',
+             'positive_reviews', 'negative_reviews', 'metacritic_score'],
+    'detail': [column for column in GAME_COLUMNS if column not in LARGE_COLUMNS],
+    'full': None,
+}
+
+def resolve_columns(profile: str = 'full', columns: Optional[List[str]] = None) -> Optional[Tuple[str, ...]]:
+    """Validated column tuple for a profile or explicit column list; None means all columns"""
+    if columns is None:
+        if profile not in PROJECTIONS:
+            raise ValueError(f"Unknown projection {profile!r}; use one of {list(PROJECTIONS)}")
+        columns = PROJECTIONS[profile]
+        if columns is None:
+            return None
+    unknown = [column for column in columns if column not in GAME_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown games columns: {unknown}")
+    # app_id is always selected so rows can be keyed and lazily completed
+    return tuple(dict.fromkeys(['app_id', *columns]))
+
+def select_list(projection: Optional[Tuple[str, ...]], alias: str = '') -> str:
+    if projection is None:
+        return f"{alias}*"
+    return ', '.join(f"{alias}{column}" for column in projection)
+
+class LazyGame(dict):
+    """A games row with only some columns selected; the rest load on first access.
+
+    Indexing or get() for an unselected column fetches all of the row's
+    remaining columns in one query. Iteration, len() and 'in' only see the
+    columns loaded so far. The row is copied, so a cached row is never
+    filled in and the loaded columns stay with this caller.
+    """
+    def __init__(self, row: Dict[str, Any], loader: Callable[[int, List[str]], Dict[str, Any]]):
+        super().__init__(row)
+        self._pending = [column for column in GAME_COLUMNS if column not in row]
+        self._loader = loader
+
+    def __missing__(self, key: str) -> Any:
+        if key not in self._pending:
+            raise KeyError(key)
+        pending, self._pending = self._pending, []
+        loaded = self._loader(self['app_id'], pending)
+        for column in pending:
+            dict.__setitem__(self, column, loaded.get(column))
+        return dict.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+@dataclass
+class GameDetails:
+    """A games row together with its related names and media URLs"""
+    game: Dict[str, Any]
+    developers: List[str] = field(default_factory=list)
+    publishers: List[str] = field(default_factory=list)
+    categories: List[str] = field(default_factory=list)
+    genres: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    screenshots: List[str] = field(default_factory=list)
+    movies: List[str] = field(default_factory=list)
+
+    @property
+    def app_id(self) -> int:
+        return self.game['app_id']
+
+def relationship_queries() -> Dict[str, str]:
+    """One SELECT (app_id, value) per relationship, with an {ids} placeholder list"""
+    queries = {}
+    for table, (junction, column) in REFERENCE_TABLES.items():
+        queries[table] = (
+            f"SELECT j.app_id, r.name AS value FROM {junction} j "
+            f"JOIN {table} r ON r.id = j.{column} "
+            f"WHERE j.app_id IN ({{ids}}) ORDER BY r.name"
+        )
+    for table in MEDIA_TABLES:
+        queries[table] = f"SELECT app_id, url AS value FROM {table} WHERE app_id IN ({{ids}}) ORDER BY id"
+    return queries
+
+RELATIONSHIP_QUERIES = relationship_queries()
+
+def fetch_in(cursor, query: str, ids: List[int]) -> Iterable[Dict[str, Any]]:
+    """Run query once per chunk of ids, substituting the placeholder list for {ids}"""
+    for start in range(0, len(ids), IN_CLAUSE_CHUNK):
+        chunk = ids[start:start + IN_CLAUSE_CHUNK]
+        cursor.execute(query.format(ids=', '.join(['%s'] * len(chunk))), chunk)
+        yield from cursor.fetchall()
+
 class DatabaseOperations:
-    def __init__(self, connection):
+    def __init__(self, connection=None, pool: Optional[ConnectionPool] = None,
+                 cache: Optional[LRUCache] = GAME_CACHE, facets=None,
+                 watch_interval: Optional[float] = 30.0):
+        """Use a dedicated connection, or borrow one from pool per operation.
+
+        Lookups read through cache (the shared GAME_CACHE by default); pass
+        cache=None to always go to the database. A cached, pooled instance
+        starts the process's changes.ChangeWatcher (every watch_interval
+        seconds), so writes by other processes evict their cache entries.
+        With a facets.FacetIndex, facet and price filters in search_games
+        are resolved in memory.
+        """
+        if connection is None and pool is None:
+            pool = get_pool(DB_CONFIG)
         self.connection = connection
+        self.pool = pool
+        self.cache = cache
+        self.facets = facets
+        # A dedicated connection can't be shared with the watcher's thread
+        if cache is not None and connection is None and watch_interval is not None:
+            watch(self, watch_interval)
+
+    @contextmanager
+    def _connection(self):
+        """Yield the dedicated connection or a pooled one for a single operation."""
+        if self.connection is not None:
+            yield self.connection
+        else:
+            with self.pool.connection() as connection:
+                yield connection
 
-    def get_game(self, app_id: int) -> Optional[Dict[str, Any]]:
-        """Retrieve a game by its app_id."""
+    def _cached(self, kind: Hashable, app_ids: List[int]) -> Tuple[Dict[int, Any], List[int], Optional[int]]:
+        """Cache hits, the ids still to load, and the cache generation to store them under"""
+        if self.cache is None:
+            return {}, list(app_ids), None
+        generation = self.cache.generation
+        found = {}
+        missing = []
+        for app_id in app_ids:
+            value = self.cache.get((kind, app_id), MISSING)
+            if value is MISSING:
+                missing.append(app_id)
+            else:
+                found[app_id] = value
+        return found, missing, generation
+
+    def _store(self, kind: Hashable, loaded: Dict[int, Any], generation: Optional[int]):
+        """Cache values loaded after _cached; dropped if an invalidation happened in between"""
+        if self.cache is not None:
+            for app_id, value in loaded.items():
+                self.cache.set((kind, app_id), value, tags=(app_id,), generation=generation)
+
+    def _read_through(self, kind: Hashable, app_ids: List[int],
+                      load: Callable[[List[int]], Dict[int, Any]]) -> Dict[int, Any]:
+        """Serve app_ids from the cache, loading only the misses; keeps app_ids order"""
+        found, missing, generation = self._cached(kind, app_ids)
+        if missing:
+            loaded = load(missing)
+            self._store(kind, loaded, generation)
+            found.update(loaded)
+        return {app_id: found.get(app_id) for app_id in app_ids}
+
+    def _project(self, row: Optional[Dict[str, Any]],
+                 projection: Optional[Tuple[str, ...]]) -> Optional[Dict[str, Any]]:
+        """A fresh LazyGame over a projected row; the cache keeps the plain row, which is never filled in"""
+        if row is None or projection is None:
+            return row
+        return LazyGame(row, self._load_columns)
+
+    def _project_details(self, details: Optional[GameDetails],
+                         projection: Optional[Tuple[str, ...]]) -> Optional[GameDetails]:
+        if details is None or projection is None:
+            return details
+        return replace(details, game=self._project(details.game, projection))
+
+    def _load_columns(self, app_id: int, columns: List[str]) -> Dict[str, Any]:
+        """Fetch the given columns of one game, for LazyGame"""
+        with self._connection() as connection, connection.cursor() as cursor:
+            cursor.execute(f"SELECT {', '.join(columns)} FROM games WHERE app_id = %s", (app_id,))
+            return cursor.fetchone() or {}
+
+    def _load_games(self, app_ids: List[int],
+                    projection: Optional[Tuple[str, ...]] = None) -> Dict[int, Dict[str, Any]]:
+        query = f"SELECT {select_list(projection)} FROM games WHERE app_id IN ({{ids}})"
+        with self._connection() as connection, connection.cursor() as cursor:
+            return {row['app_id']: row for row in fetch_in(cursor, query, app_ids)}
+
+    def _load_details(self, app_ids: List[int],
+                      projection: Optional[Tuple[str, ...]] = None) -> Dict[int, GameDetails]:
+        query = f"SELECT {select_list(projection)} FROM games WHERE app_id IN ({{ids}})"
+        with self._connection() as connection, connection.cursor() as cursor:
+            details = {row['app_id']: GameDetails(game=row) for row in fetch_in(cursor, query, app_ids)}
+
+            found = [app_id for app_id in app_ids if app_id in details]
+            for relation, query in RELATIONSHIP_QUERIES.items():
+                for row in fetch_in(cursor, query, found):
+                    getattr(details[row['app_id']], relation).append(row['value'])
+        return details
+
+    def get_game(self, app_id: int, profile: str = 'full',
+                 columns: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Retrieve a game by its app_id.
+
+        profile ('card', 'detail' or 'full') or an explicit columns list limits
+        what is selected; other columns load lazily if accessed.
+        """
+        projection = resolve_columns(profile, columns)
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT * FROM games WHERE app_id = %s", (app_id,))
-                return cursor.fetchone()
+            row = self._read_through(('game', projection), [app_id],
+                                     lambda ids: self._load_games(ids, projection))[app_id]
+            return self._project(row, projection)
         except Exception as e:
             print(f"Error getting game: {e}")
             return None
 
+    def get_games(self, app_ids: Iterable[int], profile: str = 'full',
+                  columns: Optional[List[str]] = None) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Retrieve many games at once, keyed by app_id in the caller's order.
+
+        Ids are fetched with chunked IN queries on one connection; ids with no
+        matching row map to None. profile and columns work as in get_game.
+        """
+        projection = resolve_columns(profile, columns)
+        ordered = list(dict.fromkeys(app_ids))
+        if not ordered:
+            return {}
+        try:
+            rows = self._read_through(('game', projection), ordered,
+                                      lambda ids: self._load_games(ids, projection))
+            return {app_id: self._project(row, projection) for app_id, row in rows.items()}
+        except Exception as e:
+            print(f"Error getting games: {e}")
+            return dict.fromkeys(ordered)
+
+    def get_game_details(self, app_ids: Iterable[int], profile: str = 'full',
+                         columns: Optional[List[str]] = None) -> Dict[int, Optional[GameDetails]]:
+        """Retrieve games with all their relationships, keyed by app_id in the caller's order.
+
+        Issues one query for the games rows and one per relationship type for
+        the whole batch (per 1000 ids), instead of a multi-way LEFT JOIN whose
+        rows multiply across developers x tags x screenshots and so on.
+        profile and columns apply to the games row as in get_game.
+        """
+        projection = resolve_columns(profile, columns)
+        ordered = list(dict.fromkeys(app_ids))
+        if not ordered:
+            return {}
+        try:
+            details = self._read_through(('details', projection), ordered,
+                                         lambda ids: self._load_details(ids, projection))
+            return {app_id: self._project_details(value, projection) for app_id, value in details.items()}
+        except Exception as e:
+            print(f"Error getting game details: {e}")
+            return dict.fromkeys(ordered)
+
+    def search_games(self, filters: Dict[str, Any] = None, limit: int = 10, profile: str = 'full',
+                     columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Search games with filters.
+
+        'name' is matched against the ft_name FULLTEXT index and 'text' against
+        ft_name_about (name plus description); both are prefix-aware and the
+        results are ordered by relevance. Other searches list the cheapest
+        games first (NULL prices last, ties by app_id), as the facet index
+        does. A name with no word long enough for the index falls back to a
+        LIKE 'name%' prefix match on idx_name.
+        Facet filters ('genres', 'tags', 'categories', 'developers' and
+        'platforms', each a list that must all match) are answered from the
+        facet index when one is attached and fresh, else with EXISTS subqueries.
+        profile and columns work as in get_game; 'card' suits result lists.
+        """
+        filters = filters or {}
+        projection = resolve_columns(profile, columns)
+        if self.facets is not None and self.facets.supports(filters):
+            app_ids = self.facets.search(filters, limit, with_counts=False)['app_ids']
+            games = self.get_games(app_ids, profile, columns)
+            return [games[app_id] for app_id in app_ids if games[app_id] is not None]
+
+        try:
+            query, params = self._search_query(filters, select_list(projection, 'g.'))
+            with self._connection() as connection, connection.cursor() as cursor:
+                cursor.execute(query + " LIMIT %s", params + [limit])
+                return [self._project(row, projection) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error searching games: {e}")
+            return []
+
+    def _search_query(self, filters: Dict[str, Any], columns: str) -> Tuple[str, List[Any]]:
+        """SELECT columns FROM games g matching filters, without the LIMIT, and its params"""
+        conditions = []
+        params = []
+        relevance = []
+        relevance_params = []
+
+        for key, match_columns in (('name', 'g.name'), ('text', 'g.name, g.about_the_game')):
+            if key not in filters:
+                continue
+            boolean_query = fulltext_query(filters[key])
+            if boolean_query is not None:
+                match = f"MATCH({match_columns}) AGAINST (%s IN BOOLEAN MODE)"
+                conditions.append(match)
+                params.append(boolean_query)
+                relevance.append(match)
+                relevance_params.append(boolean_query)
+            else:
+                conditions.append("g.name LIKE %s")
+                params.append(like_prefix(filters[key].strip()))
+        if 'min_price' in filters:
+            conditions.append("g.price >= %s")
+            params.append(filters['min_price'])
+        if 'max_price' in filters:
+            conditions.append("g.price <= %s")
+            params.append(filters['max_price'])
+        for facet in FACET_TABLES:
+            junction, column = REFERENCE_TABLES[facet]
+            for value in filters.get(facet, ()):
+                conditions.append(f"""EXISTS (SELECT 1 FROM {junction} j
+                    JOIN {facet} r ON r.id = j.{column}
+                    WHERE j.app_id = g.app_id AND r.name = %s)""")
+                params.append(value)
+        for platform in filters.get('platforms', ()):
+            if platform not in PLATFORMS:
+                raise ValueError(f"Unknown platform {platform!r}")
+            conditions.append(f"g.{platform} = 1")
+
+        query = f"SELECT {columns}"
+        if relevance:
+            query += f", {' + '.join(relevance)} AS relevance"
+        query += " FROM games g"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if relevance:
+            query += " ORDER BY relevance DESC, g.positive_reviews DESC"
+        else:
+            # The facet index's order, so both paths return the same games
+            query += " ORDER BY g.price IS NULL, g.price, g.app_id"
+        return query, relevance_params + params
+
+    def faceted_search(self, filters: Dict[str, Any] = None, limit: int = 10, profile: str = 'full',
+                       columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """search_games plus the total and per-facet value counts for the matching games.
+
+        Total and counts need a fresh facet index; without one they are None.
+        """
+        filters = filters or {}
+        if self.facets is None or not self.facets.supports(filters):
+            return {'games': self.search_games(filters, limit, profile, columns),
+                    'total': None, 'counts': None}
+        result = self.facets.search(filters, limit)
+        games = self.get_games(result['app_ids'], profile, columns)
+        return {
+            'games': [games[app_id] for app_id in result['app_ids'] if games[app_id] is not None],
+            'total': result['total'],
+            'counts': result['counts'],
+        }
+
+    def _page(self, table: str, order_columns: List[str], order_by: str, page_size: int,
+              after: Optional[str], descending: bool,
+              select: str = '*') -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One keyset page of table ordered by order_by, app_id, plus the next cursor"""
+        if order_by not in order_columns:
+            raise ValueError(f"Cannot paginate on {order_by!r}; use one of {order_columns}")
+        direction = 'DESC' if descending else 'ASC'
+        query = f"SELECT {select} FROM {table}"
+        params = []
+        if after is not None:
+            condition, params = seek_condition(order_by, descending, *decode_cursor(after, order_by, descending))
+            query += f" WHERE {condition}"
+        if order_by == 'app_id':
+            query += f" ORDER BY app_id {direction} LIMIT %s"
+        else:
+            query += f" ORDER BY {order_by} {direction}, app_id {direction} LIMIT %s"
+        # One extra row tells us whether another page exists
+        params.append(page_size + 1)
+
+        with self._connection() as connection, connection.cursor() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        if len(rows) <= page_size:
+            return list(rows), None
+        rows = list(rows[:page_size])
+        return rows, encode_cursor(order_by, descending, rows[-1])
+
+    def get_games_page(self, order_by: str = 'app_id', page_size: int = 50,
+                       after: Optional[str] = None, descending: bool = False,
+                       profile: str = 'full',
+                       columns: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one page of games and the cursor for the next (None on the last page).
+
+        Uses keyset pagination: the cursor records the last row's sort value and
+        app_id, and the next page seeks past it through the column's index, so
+        deep pages cost the same as the first. profile and columns work as in
+        get_game; the sort column is always selected.
+        """
+        projection = resolve_columns(profile, columns)
+        if projection is not None and order_by not in projection:
+            projection += (order_by,)
+        try:
+            rows, cursor = self._page('games', PAGE_ORDER_COLUMNS, order_by, page_size, after,
+                                      descending, select_list(projection))
+            return [self._project(row, projection) for row in rows], cursor
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"Error getting games page: {e}")
+            return [], None
+
+    def iter_games(self, order_by: str = 'app_id', page_size: int = 50,
+                   after: Optional[str] = None, descending: bool = False, profile: str = 'full',
+                   columns: Optional[List[str]] = None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Yield (rows, next_cursor) pages in order, starting after the given cursor."""
+        while True:
+            rows, after = self.get_games_page(order_by, page_size, after, descending, profile, columns)
+            if rows:
+                yield rows, after
+            if after is None:
+                return
+
+    def count_games(self, estimated: bool = False) -> Optional[int]:
+        """Total number of games.
+
+        The exact COUNT(*) is cached until the next write; estimated reads
+        InnoDB's approximate row count from information_schema instead, which
+        never scans the table.
+        """
+        def load():
+            with self._connection() as connection, connection.cursor() as cursor:
+                if estimated:
+                    cursor.execute("""
+                        SELECT TABLE_ROWS AS total FROM information_schema.tables
+                        WHERE table_schema = %s AND table_name = 'games'
+                    """, (DB_CONFIG['db'],))
+                else:
+                    cursor.execute("SELECT COUNT(*) AS total FROM games")
+                row = cursor.fetchone()
+                return int(row['total']) if row and row['total'] is not None else None
+
+        try:
+            if self.cache is None:
+                return load()
+            return self.cache.get_or_load(('count', estimated), load, tags=(CATALOG_TAG,))
+        except Exception as e:
+            print(f"Error counting games: {e}")
+            return None
+
+    def _load_summaries(self, app_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        with self._connection() as connection, connection.cursor() as cursor:
+            return {row['app_id']: decode_summary(row)
+                    for row in fetch_in(cursor, "SELECT * FROM game_summary WHERE app_id IN ({ids})", app_ids)}
+
+    def get_summaries(self, app_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """game_summary rows (with genre and developer lists) keyed by app_id in the caller's order"""
+        ordered = list(dict.fromkeys(app_ids))
+        if not ordered:
+            return {}
+        try:
+            return self._read_through('summary', ordered, self._load_summaries)
+        except Exception as e:
+            print(f"Error getting game summaries: {e}")
+            return dict.fromkeys(ordered)
+
+    def browse_games(self, order_by: str = 'positive_reviews', page_size: int = 50,
+                     after: Optional[str] = None,
+                     descending: bool = True) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """A keyset page of game_summary rows for list views, and the next cursor.
+
+        Each page is a single-table range scan on one of the summary indexes;
+        no joins or GROUP_CONCAT at read time.
+        """
+        try:
+            rows, cursor = self._page('game_summary', SUMMARY_ORDER_COLUMNS, order_by,
+                                      page_size, after, descending)
+            return [decode_summary(row) for row in rows], cursor
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"Error browsing games: {e}")
+            return [], None
+
+    def search_summaries(self, filters: Dict[str, Any] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """search_games returning game_summary rows, for result lists"""
+        filters = filters or {}
+        try:
+            if self.facets is not None and self.facets.supports(filters):
+                app_ids = self.facets.search(filters, limit, with_counts=False)['app_ids']
+            else:
+                query, params = self._search_query(filters, "g.app_id")
+                with self._connection() as connection, connection.cursor() as cursor:
+                    cursor.execute(query + " LIMIT %s", params + [limit])
+                    app_ids = [row['app_id'] for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error searching games: {e}")
+            return []
+        summaries = self.get_summaries(app_ids)
+        return [summaries[app_id] for app_id in app_ids if summaries[app_id] is not None]
+
+def uncached_db_ops() -> DatabaseOperations:
+    """A pooled DatabaseOperations that bypasses the cache, for indexes that read whole tables"""
+    return DatabaseOperations(pool=get_pool(DB_CONFIG), cache=None)
+
 def get_game_info_by_app_id(app_id: int):
     """Fetch game information based on app_id and print it."""
-    # Establish database connection
-    connection = pymysql.connect(**DB_CONFIG)
-    
+    # Borrow a warm connection from the shared pool instead of connecting per lookup
     try:
-        db_ops = DatabaseOperations(connection)
+        db_ops = DatabaseOperations(pool=get_pool(DB_CONFIG), watch_interval=None)
         game_info = db_ops.get_game(app_id)
         
         if game_info:
@@ -46,9 +647,48 @@ def get_game_info_by_app_id(app_id: int):
             print("Game not found.")
     except Exception as e:
         print(f"Error fetching game info: {e}")
-    finally:
-        connection.close()
+
+def benchmark_search(terms: List[str], repeat: int = 5, limit: int = 20):
+    """Compare the old leading-wildcard LIKE scan with the FULLTEXT search per term"""
+    db_ops = uncached_db_ops()
+
+    def best_of(query: str, params: List[Any]) -> Tuple[float, int]:
+        best, count = float('inf'), 0
+        for _ in range(repeat):
+            with db_ops._connection() as connection, connection.cursor() as cursor:
+                start = time.perf_counter()
+                cursor.execute(query, params)
+                count = len(cursor.fetchall())
+                best = min(best, time.perf_counter() - start)
+        return best, count
+
+    for term in terms:
+        like_time, like_count = best_of("SELECT app_id FROM games WHERE name LIKE %s LIMIT %s",
+                                        [f"%{term}%", limit])
+        boolean_query = fulltext_query(term)
+        if boolean_query is None:
+            print(f"{term!r}: LIKE {like_time * 1000:.1f} ms ({like_count} rows); too short for FULLTEXT")
+            continue
+        ft_time, ft_count = best_of("""SELECT app_id FROM games
+                                       WHERE MATCH(name) AGAINST (%s IN BOOLEAN MODE)
+                                       ORDER BY MATCH(name) AGAINST (%s IN BOOLEAN MODE) DESC
+                                       LIMIT %s""", [boolean_query, boolean_query, limit])
+        speedup = like_time / ft_time if ft_time > 0 else float('inf')
+        print(f"{term!r} ({boolean_query}): LIKE {like_time * 1000:.1f} ms ({like_count} rows), "
+              f"FULLTEXT {ft_time * 1000:.1f} ms ({ft_count} rows), {speedup:.1f}x")
+        if like_count and not ft_count:
+            print(f"  FULLTEXT found nothing that LIKE found for {term!r}")
 
 if __name__ == "__main__":
-    app_id = 730  # Replace with the app_id you want to fetch
-    get_game_info_by_app_id(app_id)
+    parser = argparse.ArgumentParser(description="Look up games in the PlayHorizon database")
+    parser.add_argument('app_id', nargs='?', type=int, default=730,
+                        help="app_id of the game to fetch")
+    parser.add_argument('--benchmark-search', nargs='*', metavar='TERM',
+                        help="Time LIKE '%%term%%' against the FULLTEXT search for each term "
+                             f"(default: {', '.join(BENCHMARK_TERMS)})")
+    args = parser.parse_args()
+
+    if args.benchmark_search is not None:
+        benchmark_search(args.benchmark_search or BENCHMARK_TERMS)
+    else:
+        get_game_info_by_app_id(args.app_id)
@@ -0,0 +1,223 @@
+from typing import Dict, Any, List, Optional, Iterable, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import threading
+import time
+import numpy as np
+from scipy import sparse
+from read import DatabaseOperations, REFERENCE_TABLES, uncached_db_ops
+from changes import Debouncer, subscribe
+
+# Feature tables and their weight in the similarity; tags are the most specific signal
+FEATURE_WEIGHTS = {'tags': 1.0, 'genres': 0.5, 'categories': 0.25}
+# Neighbors kept per game
+TOP_N = 50
+# Upper bound for one dense block of similarities (rows x games float32)
+CHUNK_BYTES = 32 * 1024 * 1024
+
+class Recommender:
+    """"More like this" from the tag, genre and category junction tables.
+
+    Every game is a sparse row of weighted features, L2-normalized, so a
+    matrix product gives cosine similarities. The top TOP_N neighbors of
+    every game are precomputed block by block: each block is one sparse
+    product against the (small, dense) transposed feature matrix and an
+    argpartition per row. Blocks run on a thread pool. similar_games is
+    then a row lookup.
+
+    Once attached, the games passed to cache.invalidate_games are
+    recomputed rebuild_delay seconds after the last write. Only the
+    written games and the games whose neighbor lists contained them get a
+    full row; every other list is merged with the new similarities to the
+    written games. A write that adds or removes games rebuilds everything.
+    """
+    def __init__(self, db_ops: Optional[DatabaseOperations] = None, top_n: int = TOP_N,
+                 workers: Optional[int] = None, rebuild_delay: float = 5.0):
+        self.db_ops = db_ops or uncached_db_ops()
+        self.top_n = top_n
+        self.workers = workers or os.cpu_count() or 1
+        self.rebuild_delay = rebuild_delay
+        self.app_ids = np.zeros(0, dtype=np.int64)
+        self.matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+        # Row p holds game p's neighbor positions (-1 pads) and similarities, best first
+        self.neighbors = np.zeros((0, top_n), dtype=np.int32)
+        self.scores = np.zeros((0, top_n), dtype=np.float32)
+        self._pending: Set[int] = set()
+        self._debouncer = Debouncer(rebuild_delay, self._rebuild)
+        self._lock = threading.Lock()
+
+    def _fetch_matrix(self) -> Tuple[np.ndarray, sparse.csr_matrix]:
+        """app_ids in ascending order and their normalized feature matrix"""
+        with self.db_ops._connection() as connection, connection.cursor() as cursor:
+            cursor.execute("SELECT app_id FROM games ORDER BY app_id")
+            app_ids = np.fromiter((row['app_id'] for row in cursor.fetchall()), dtype=np.int64)
+            rows, columns, weights = [], [], []
+            offset = 0
+            for table, weight in FEATURE_WEIGHTS.items():
+                junction, column = REFERENCE_TABLES[table]
+                cursor.execute(f"SELECT app_id, {column} AS feature FROM {junction}")
+                pairs = cursor.fetchall()
+                games = np.fromiter((row['app_id'] for row in pairs), dtype=np.int64, count=len(pairs))
+                features = np.fromiter((row['feature'] for row in pairs), dtype=np.int64, count=len(pairs))
+                positions = np.searchsorted(app_ids, games)
+                known = np.isin(games, app_ids)
+                ids, codes = np.unique(features[known], return_inverse=True)
+                rows.append(positions[known])
+                columns.append(codes + offset)
+                weights.append(np.full(len(codes), weight, dtype=np.float32))
+                offset += len(ids)
+
+        matrix = sparse.csr_matrix(
+            (np.concatenate(weights), (np.concatenate(rows), np.concatenate(columns))),
+            shape=(len(app_ids), offset), dtype=np.float32)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return app_ids, sparse.csr_matrix(matrix.multiply(1 / norms[:, None]), dtype=np.float32)
+
+    def _top_rows(self, matrix: sparse.csr_matrix, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Neighbor positions and similarities for the given rows, computed in blocks on the pool"""
+        count = matrix.shape[0]
+        block = max(1, CHUNK_BYTES // (4 * max(count, 1)))
+        # features x games is small (a few hundred features) and sparse @ dense skips the sparse output
+        transposed = matrix.T.toarray()
+        blocks = [positions[start:start + block] for start in range(0, len(positions), block)]
+
+        def top_block(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            similarities = matrix[rows] @ transposed
+            similarities[np.arange(len(rows)), rows] = -1  # never a game's own neighbor
+            return self._select(similarities)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(top_block, blocks))
+        if not results:
+            return (np.zeros((0, self.top_n), dtype=np.int32), np.zeros((0, self.top_n), dtype=np.float32))
+        return np.vstack([found for found, _ in results]), np.vstack([scores for _, scores in results])
+
+    def _select(self, similarities: np.ndarray,
+                candidates: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Per row, the top_n candidates by similarity, padded with -1 where nothing is similar.
+
+        Without candidates, column j of similarities is game position j.
+        """
+        keep = min(self.top_n, similarities.shape[1])
+        if similarities.shape[1] > keep:
+            chosen = np.argpartition(-similarities, keep - 1, axis=1)[:, :keep]
+        else:
+            chosen = np.tile(np.arange(keep), (len(similarities), 1))
+        similarities = np.take_along_axis(similarities, chosen, axis=1)
+        candidates = chosen if candidates is None else np.take_along_axis(candidates, chosen, axis=1)
+        order = np.argsort(-similarities, axis=1, kind='stable')
+        similarities = np.take_along_axis(similarities, order, axis=1)
+        candidates = np.take_along_axis(candidates, order, axis=1)
+
+        found = np.full((len(similarities), self.top_n), -1, dtype=np.int32)
+        scores = np.zeros((len(similarities), self.top_n), dtype=np.float32)
+        similar = similarities > 0
+        found[:, :keep] = np.where(similar, candidates, -1)
+        scores[:, :keep] = np.where(similar, similarities, 0)
+        return found, scores
+
+    def load(self):
+        """Rebuild the matrix and every neighbor list"""
+        app_ids, matrix = self._fetch_matrix()
+        neighbors, scores = self._top_rows(matrix, np.arange(len(app_ids)))
+        with self._lock:
+            self.app_ids, self.matrix = app_ids, matrix
+            self.neighbors, self.scores = neighbors, scores
+        return self
+
+    def refresh(self, app_ids: Iterable[int]):
+        """Recompute after the given games' features changed"""
+        written = np.fromiter(set(app_ids), dtype=np.int64)
+        all_ids, matrix = self._fetch_matrix()
+        with self._lock:
+            old_ids, old_neighbors, old_scores = self.app_ids, self.neighbors, self.scores
+        if not np.array_equal(all_ids, old_ids):
+            # Positions moved, so no neighbor list can be reused
+            neighbors, scores = self._top_rows(matrix, np.arange(len(all_ids)))
+        else:
+            changed = np.searchsorted(all_ids, written)
+            known = changed < len(all_ids)
+            changed = np.unique(changed[known][all_ids[changed[known]] == written[known]])
+            # A list holding a written game may now be missing a game ranked below it
+            recompute = np.union1d(changed, np.flatnonzero(np.isin(old_neighbors, changed).any(axis=1)))
+            neighbors, scores = old_neighbors.copy(), old_scores.copy()
+            if len(recompute):
+                neighbors[recompute], scores[recompute] = self._top_rows(matrix, recompute)
+            rest = np.setdiff1d(np.arange(len(all_ids)), recompute)
+            if len(changed):
+                # Every other list only has to consider the written games as newcomers
+                columns = matrix[changed].T.toarray()
+                block = max(1, CHUNK_BYTES // (4 * (len(changed) + self.top_n)))
+                for start in range(0, len(rest), block):
+                    rows = rest[start:start + block]
+                    similarities = np.hstack([scores[rows], matrix[rows] @ columns])
+                    candidates = np.hstack([neighbors[rows], np.tile(changed.astype(np.int32), (len(rows), 1))])
+                    neighbors[rows], scores[rows] = self._select(similarities, candidates)
+        with self._lock:
+            self.app_ids, self.matrix = all_ids, matrix
+            self.neighbors, self.scores = neighbors, scores
+        return self
+
+    def attach(self, poll_interval: Optional[float] = 30.0):
+        """Recompute rebuild_delay seconds after the last reported write (see changes.subscribe)"""
+        subscribe(self._on_write, self.db_ops, poll_interval)
+        return self
+
+    def _on_write(self, app_ids: List[int]):
+        with self._lock:
+            self._pending.update(app_ids)
+        self._debouncer.trigger()
+
+    def _rebuild(self):
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        try:
+            self.refresh(pending)
+        except Exception as e:
+            print(f"Error rebuilding recommendations: {e}")
+
+    def similar_games(self, app_id: int, k: int = 10) -> List[Dict[str, Any]]:
+        """Up to k most similar games (k <= top_n) as app_id and cosine similarity, best first"""
+        with self._lock:
+            position = int(np.searchsorted(self.app_ids, app_id))
+            if position >= len(self.app_ids) or self.app_ids[position] != app_id:
+                return []
+            found = self.neighbors[position, :k]
+            scores = self.scores[position, :k]
+            return [{'app_id': int(self.app_ids[neighbor]), 'similarity': float(score)}
+                    for neighbor, score in zip(found, scores) if neighbor >= 0]
+
+def benchmark_build(recommender: Recommender):
+    """Time a full neighbor build on one thread and on every worker"""
+    app_ids, matrix = recommender._fetch_matrix()
+    positions = np.arange(len(app_ids))
+    workers = recommender.workers
+    for count in dict.fromkeys([1, workers]):
+        recommender.workers = count
+        start = time.perf_counter()
+        recommender._top_rows(matrix, positions)
+        print(f"{len(app_ids)} games x {matrix.shape[1]} features, {count} thread(s): "
+              f"{time.perf_counter() - start:.2f}s")
+    recommender.workers = workers
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Games similar to a game by tags, genres and categories")
+    parser.add_argument('app_id', type=int, nargs='?', default=730)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--workers', type=int, help="Threads for the build (default: one per core)")
+    parser.add_argument('--benchmark', action='store_true', help="Time the build single- and multi-threaded")
+    args = parser.parse_args()
+
+    recommender = Recommender(workers=args.workers)
+    start = time.perf_counter()
+    recommender.load()
+    print(f"Built neighbors for {len(recommender.app_ids)} games in {time.perf_counter() - start:.2f}s")
+    similar = recommender.similar_games(args.app_id, args.k)
+    summaries = recommender.db_ops.get_summaries([game['app_id'] for game in similar])
+    for game in similar:
+        summary = summaries.get(game['app_id'])
+        print(f"  {game['similarity']:.3f}  {game['app_id']}: {summary['name'] if summary else '?'}")
+    if args.benchmark:
+        benchmark_build(recommender)
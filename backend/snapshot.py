@@ -0,0 +1,265 @@
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import re
+import shutil
+import time
+import polars as pl
+import pyarrow as pa
+import pymysql
+from pymysql.constants import FIELD_TYPE
+from read import (GameDetails, LazyGame, REFERENCE_TABLES, MEDIA_TABLES, FACET_TABLES, PLATFORMS,
+                  resolve_columns, fulltext_words)
+
+# Versioned snapshots live in SNAPSHOT_DIR/<version>/, LATEST names the newest complete one
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+LATEST_FILE = 'LATEST'
+MANIFEST_FILE = 'manifest.json'
+SNAPSHOT_FORMAT = 1
+# Rows per Arrow record batch while streaming a table out of MySQL
+EXPORT_BATCH = 10000
+
+def relationship_export_queries() -> Dict[str, str]:
+    """(app_id, value) rows for every relationship, sorted by app_id for range lookups"""
+    queries = {}
+    for table, (junction, column) in REFERENCE_TABLES.items():
+        queries[table] = (f"SELECT j.app_id, r.name AS value FROM {junction} j "
+                          f"JOIN {table} r ON r.id = j.{column} ORDER BY j.app_id, r.name")
+    for table in MEDIA_TABLES:
+        queries[table] = f"SELECT app_id, url AS value FROM {table} ORDER BY app_id, id"
+    return queries
+
+def arrow_type(description: tuple) -> pa.DataType:
+    """Arrow type for a pymysql cursor.description entry"""
+    type_code, scale = description[1], description[5]
+    if type_code in (FIELD_TYPE.TINY, FIELD_TYPE.SHORT, FIELD_TYPE.LONG, FIELD_TYPE.INT24,
+                     FIELD_TYPE.LONGLONG, FIELD_TYPE.YEAR):
+        return pa.int64()
+    if type_code in (FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL):
+        return pa.decimal128(38, scale or 0)
+    if type_code in (FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE):
+        return pa.float64()
+    if type_code in (FIELD_TYPE.DATE, FIELD_TYPE.NEWDATE):
+        return pa.date32()
+    if type_code in (FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP):
+        return pa.timestamp('us')
+    return pa.string()
+
+def export_table(connection, query: str, path: str) -> int:
+    """Stream a query's rows into an Arrow IPC file EXPORT_BATCH rows at a time; returns rows written.
+
+    The unbuffered cursor keeps only one batch in memory, whatever the table size.
+    """
+    rows_written = 0
+    with connection.cursor(pymysql.cursors.SSCursor) as cursor:
+        cursor.execute(query)
+        schema = pa.schema([(column[0], arrow_type(column)) for column in cursor.description])
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH)
+                if not rows:
+                    break
+                columns = [pa.array([row[index] for row in rows], type=field.type)
+                           for index, field in enumerate(schema)]
+                writer.write_batch(pa.record_batch(columns, schema=schema))
+                rows_written += len(rows)
+    return rows_written
+
+def export_snapshot(connection, directory: str = SNAPSHOT_DIR, keep: int = 3) -> str:
+    """Write games and every relationship table as Arrow IPC files; returns the snapshot path.
+
+    Files are uncompressed so readers can memory-map them. A snapshot only
+    becomes visible once LATEST is switched to it, and all but the newest
+    keep snapshots are removed.
+    """
+    version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    path = os.path.join(directory, version)
+    staging = path + '.tmp'
+    os.makedirs(staging)
+    try:
+        queries = {'games': "SELECT * FROM games ORDER BY app_id", **relationship_export_queries()}
+        rows = {table: export_table(connection, query, os.path.join(staging, f"{table}.arrow"))
+                for table, query in queries.items()}
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'version': version,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'rows': rows,
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(staging, path)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    latest_tmp = os.path.join(directory, LATEST_FILE + '.tmp')
+    with open(latest_tmp, 'w') as f:
+        f.write(version)
+    os.replace(latest_tmp, os.path.join(directory, LATEST_FILE))
+
+    versions = sorted(name for name in os.listdir(directory)
+                      if os.path.isdir(os.path.join(directory, name)) and not name.endswith('.tmp'))
+    for old in versions[:-keep] if keep > 0 else []:
+        shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+    return path
+
+def latest_snapshot(directory: str = SNAPSHOT_DIR) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, LATEST_FILE)) as f:
+            return os.path.join(directory, f.read().strip())
+    except FileNotFoundError:
+        return None
+
+def read_mapped(path: str) -> pl.DataFrame:
+    """Memory-map an uncompressed Arrow IPC file; pages load only when touched"""
+    with pa.memory_map(path, 'r') as source:
+        # No rechunk: merging the record batches would copy them out of the mapping
+        return pl.from_arrow(pa.ipc.open_file(source).read_all(), rechunk=False)
+
+class SnapshotCatalog:
+    """Read-only catalog served from an exported snapshot, with no DB connection.
+
+    Implements get_game, get_games, get_game_details and search_games with
+    the same arguments and results as DatabaseOperations (minus the FULLTEXT
+    relevance score), so a read replica can swap it in. Projected rows are
+    LazyGames whose other columns come from the mapped frame.
+    games and every relationship frame are sorted by app_id, so lookups are
+    binary searches.
+    """
+    def __init__(self, path: Optional[str] = None):
+        path = path or latest_snapshot()
+        if path is None:
+            raise FileNotFoundError(f"No snapshot found in {SNAPSHOT_DIR}")
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            self.manifest = json.load(f)
+        self.path = path
+        self.version = self.manifest['version']
+        self.games = read_mapped(os.path.join(path, 'games.arrow'))
+        self.relations = {table: read_mapped(os.path.join(path, f"{table}.arrow"))
+                          for table in list(REFERENCE_TABLES) + MEDIA_TABLES}
+        self._app_ids = self.games['app_id']
+
+    def _position(self, app_id: int) -> Optional[int]:
+        position = self._app_ids.search_sorted(app_id)
+        if position < len(self._app_ids) and self._app_ids[position] == app_id:
+            return position
+        return None
+
+    def _row(self, position: int, projection: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        if projection is None:
+            return self.games.row(position, named=True)
+        return LazyGame(self.games.select(list(projection)).row(position, named=True), self._load_columns)
+
+    def _load_columns(self, app_id: int, columns: List[str]) -> Dict[str, Any]:
+        """The given columns of one game, for LazyGame; columns an older snapshot lacks are None"""
+        position = self._position(app_id)
+        present = [column for column in columns if column in self.games.columns]
+        return self.games.select(present).row(position, named=True) if position is not None else {}
+
+    def get_game(self, app_id: int, profile: str = 'full',
+                 columns: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        projection = resolve_columns(profile, columns)
+        position = self._position(app_id)
+        return self._row(position, projection) if position is not None else None
+
+    def get_games(self, app_ids: Iterable[int], profile: str = 'full',
+                  columns: Optional[List[str]] = None) -> Dict[int, Optional[Dict[str, Any]]]:
+        resolve_columns(profile, columns)
+        return {app_id: self.get_game(app_id, profile, columns) for app_id in dict.fromkeys(app_ids)}
+
+    def _values(self, table: str, app_id: int) -> List[str]:
+        df = self.relations[table]
+        column = df['app_id']
+        start = column.search_sorted(app_id, side='left')
+        end = column.search_sorted(app_id, side='right')
+        return df['value'].slice(start, end - start).to_list()
+
+    def get_game_details(self, app_ids: Iterable[int], profile: str = 'full',
+                         columns: Optional[List[str]] = None) -> Dict[int, Optional[GameDetails]]:
+        resolve_columns(profile, columns)
+        details = {}
+        for app_id in dict.fromkeys(app_ids):
+            game = self.get_game(app_id, profile, columns)
+            if game is None:
+                details[app_id] = None
+                continue
+            details[app_id] = GameDetails(game=game, **{table: self._values(table, app_id)
+                                                        for table in self.relations})
+        return details
+
+    def search_games(self, filters: Dict[str, Any] = None, limit: int = 10, profile: str = 'full',
+                     columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Same filters, matches and order as DatabaseOperations.search_games.
+
+        'name' and 'text' require every fulltext_words word to start a word
+        of the name (or the name and description), ordered by positive
+        reviews in place of relevance; a term with no indexable word is a
+        case-insensitive prefix of the name. Other searches list the
+        cheapest games first (NULL prices last, ties by app_id).
+        """
+        filters = filters or {}
+        projection = resolve_columns(profile, columns)
+        predicates = []
+        ranked = False
+        for key, match_columns in (('name', ['name']), ('text', ['name', 'about_the_game'])):
+            if key not in filters:
+                continue
+            words = fulltext_words(filters[key])
+            if not words:
+                prefix = filters[key].strip().lower()
+                predicates.append(pl.col('name').str.to_lowercase().str.starts_with(prefix).fill_null(False))
+                continue
+            ranked = True
+            for word in words:
+                pattern = rf"(?i)\b{re.escape(word)}"
+                predicates.append(pl.any_horizontal(
+                    pl.col(column).str.contains(pattern).fill_null(False) for column in match_columns))
+        if 'min_price' in filters:
+            predicates.append(pl.col('price') >= float(filters['min_price']))
+        if 'max_price' in filters:
+            predicates.append(pl.col('price') <= float(filters['max_price']))
+        for platform in filters.get('platforms', ()):
+            if platform not in PLATFORMS:
+                raise ValueError(f"Unknown platform {platform!r}")
+            predicates.append(pl.col(platform) == 1)
+
+        games = self.games.lazy()
+        if predicates:
+            games = games.filter(pl.all_horizontal(predicates))
+        for facet in FACET_TABLES:
+            for value in filters.get(facet, ()):
+                matching = self.relations[facet].lazy().filter(pl.col('value') == value).select('app_id')
+                games = games.join(matching, on='app_id', how='semi')
+        if ranked:
+            games = games.sort('positive_reviews', descending=True, nulls_last=True)
+        else:
+            games = games.sort(['price', 'app_id'], nulls_last=True)
+        games = games.head(limit)
+        if projection is None:
+            return games.collect().to_dicts()
+        rows = games.select(list(projection)).collect().to_dicts()
+        return [LazyGame(row, self._load_columns) for row in rows]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the latest catalog snapshot")
+    parser.add_argument('--path', help="Snapshot directory (default: latest)")
+    parser.add_argument('--app-id', type=int, default=730)
+    parser.add_argument('--name', help="Search by name instead of fetching --app-id")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = SnapshotCatalog(args.path)
+    print(f"Snapshot {catalog.version}: {len(catalog.games)} games, "
+          f"opened in {(time.perf_counter() - start) * 1000:.1f} ms")
+    if args.name:
+        for game in catalog.search_games({'name': args.name}):
+            print(f"{game['app_id']}: {game['name']}")
+    else:
+        details = catalog.get_game_details([args.app_id])[args.app_id]
+        if details is None:
+            print("Game not found.")
+        else:
+            print(f"{details.game['name']}: genres {details.genres}, developers {details.developers}")
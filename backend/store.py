@@ -0,0 +1,261 @@
+from typing import Dict, Any, List, Optional, Iterable
+import argparse
+import sys
+import time
+import numpy as np
+from read import DatabaseOperations, PLATFORMS, select_list, uncached_db_ops
+
+# Columns kept by GameStore; the large text columns stay in MySQL
+FLOAT_COLUMNS = ['price']
+INT_COLUMNS = [
+    'peak_ccu', 'required_age', 'dlc_count', 'metacritic_score', 'user_score',
+    'positive_reviews', 'negative_reviews', 'achievements', 'recommendations',
+    'average_playtime_forever', 'average_playtime_two_weeks',
+    'median_playtime_forever', 'median_playtime_two_weeks',
+]
+FLAG_COLUMNS = list(PLATFORMS)
+DATE_COLUMNS = ['release_date']
+STRING_COLUMNS = [
+    'name', 'estimated_owners', 'header_image', 'website', 'support_url', 'support_email',
+    'metacritic_url', 'score_rank',
+]
+STORE_COLUMNS = ['app_id'] + STRING_COLUMNS + DATE_COLUMNS + FLOAT_COLUMNS + INT_COLUMNS + FLAG_COLUMNS
+
+def _review_percentage(store: 'GameStore') -> np.ndarray:
+    positive = store.column('positive_reviews')
+    total = positive + store.column('negative_reviews')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, 100 * positive / total, np.nan)
+
+def _total_reviews(store: 'GameStore') -> np.ndarray:
+    return store.column('positive_reviews') + store.column('negative_reviews')
+
+# Columns computed from the stored arrays on demand
+DERIVED_COLUMNS = {
+    'review_percentage': _review_percentage,
+    'total_reviews': _total_reviews,
+}
+
+def deep_size(value: Any, seen: Optional[set] = None) -> int:
+    """Bytes of value and everything it references, counting shared objects once"""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        size = sys.getsizeof(value)
+        if value.dtype == object:
+            size += sum(deep_size(item, seen) for item in value)
+        return size
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(deep_size(item, seen) for item in value)
+    return size
+
+class GameRecord:
+    """One game materialized from a GameStore; slots instead of a per-game dict"""
+    __slots__ = tuple(STORE_COLUMNS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {column: getattr(self, column) for column in STORE_COLUMNS}
+
+    def __repr__(self):
+        return f"GameRecord(app_id={self.app_id}, name={self.name!r})"
+
+class GameStore:
+    """Column-oriented in-process copy of the games table.
+
+    Every column is one NumPy array in app_id order, so a lookup is a binary
+    search of app_ids and filters and rankings are vectorized over whole
+    columns. Integer NULLs are stored as 0 with a mask in nulls; NULL prices
+    are NaN. Strings live in object arrays with repeated values interned,
+    so equal values are one object. A GameRecord is only built when a game
+    is read. Holds the 'detail' columns without the long text fields.
+    """
+    def __init__(self, db_ops: Optional[DatabaseOperations] = None):
+        self.db_ops = db_ops or uncached_db_ops()
+        self.app_ids = np.zeros(0, dtype=np.int64)
+        self.columns: Dict[str, np.ndarray] = {}
+        self.nulls: Dict[str, np.ndarray] = {}
+
+    def _fetch(self) -> List[Dict[str, Any]]:
+        with self.db_ops._connection() as connection, connection.cursor() as cursor:
+            cursor.execute(f"SELECT {select_list(STORE_COLUMNS)} FROM games ORDER BY app_id")
+            return list(cursor.fetchall())
+
+    def load(self, rows: Optional[List[Dict[str, Any]]] = None):
+        """Build the arrays from rows with STORE_COLUMNS, or from the games table"""
+        rows = sorted(self._fetch() if rows is None else rows, key=lambda row: row['app_id'])
+        count = len(rows)
+        columns = {}
+        nulls = {}
+        app_ids = np.fromiter((row['app_id'] for row in rows), dtype=np.int64, count=count)
+        for column in FLOAT_COLUMNS:
+            columns[column] = np.fromiter(
+                (row[column] if row[column] is not None else np.nan for row in rows),
+                dtype=np.float64, count=count)
+        for column in INT_COLUMNS:
+            missing = np.fromiter((row[column] is None for row in rows), dtype=bool, count=count)
+            columns[column] = np.fromiter((row[column] or 0 for row in rows), dtype=np.int32, count=count)
+            if missing.any():
+                nulls[column] = missing
+        for column in FLAG_COLUMNS:
+            columns[column] = np.fromiter((bool(row[column]) for row in rows), dtype=bool, count=count)
+        for column in DATE_COLUMNS:
+            columns[column] = np.array([row[column] if row[column] is not None else 'NaT' for row in rows],
+                                       dtype='datetime64[D]')
+        for column in STRING_COLUMNS:
+            values = np.empty(count, dtype=object)
+            values[:] = [sys.intern(row[column]) if row[column] is not None else None for row in rows]
+            columns[column] = values
+
+        self.app_ids = app_ids
+        self.columns = columns
+        self.nulls = nulls
+        return self
+
+    def __len__(self) -> int:
+        return len(self.app_ids)
+
+    def position(self, app_id: int) -> Optional[int]:
+        position = int(np.searchsorted(self.app_ids, app_id))
+        if position < len(self.app_ids) and self.app_ids[position] == app_id:
+            return position
+        return None
+
+    def __contains__(self, app_id: int) -> bool:
+        return self.position(app_id) is not None
+
+    def record(self, position: int) -> GameRecord:
+        record = GameRecord()
+        record.app_id = int(self.app_ids[position])
+        for column in STRING_COLUMNS:
+            setattr(record, column, self.columns[column][position])
+        for column in DATE_COLUMNS:
+            setattr(record, column, self.columns[column][position].item())
+        for column in FLOAT_COLUMNS:
+            value = float(self.columns[column][position])
+            setattr(record, column, None if np.isnan(value) else value)
+        for column in INT_COLUMNS:
+            missing = column in self.nulls and self.nulls[column][position]
+            setattr(record, column, None if missing else int(self.columns[column][position]))
+        for column in FLAG_COLUMNS:
+            setattr(record, column, bool(self.columns[column][position]))
+        return record
+
+    def get(self, app_id: int) -> Optional[GameRecord]:
+        position = self.position(app_id)
+        return self.record(position) if position is not None else None
+
+    def get_many(self, app_ids: Iterable[int]) -> Dict[int, Optional[GameRecord]]:
+        """Records for several games, in the given order, with None for unknown ids"""
+        return {app_id: self.get(app_id) for app_id in dict.fromkeys(app_ids)}
+
+    def column(self, name: str) -> np.ndarray:
+        """A stored or derived column as an array; integer NULLs read as 0"""
+        if name in DERIVED_COLUMNS:
+            return DERIVED_COLUMNS[name](self)
+        if name not in self.columns:
+            raise ValueError(f"Unknown column {name!r}")
+        return self.columns[name]
+
+    def _numeric(self, name: str) -> np.ndarray:
+        """A numeric column as floats with NaN for NULL, for comparisons and ranking"""
+        if name in STRING_COLUMNS or name in DATE_COLUMNS:
+            raise ValueError(f"Column {name!r} is not numeric")
+        values = self.column(name).astype(np.float64)
+        if name in self.nulls:
+            values[self.nulls[name]] = np.nan
+        return values
+
+    def mask(self, filters: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """Boolean array of the games matching every filter.
+
+        'platforms' lists flags that must all be set; 'min_<column>' and
+        'max_<column>' bound any numeric or derived column (so 'min_price'
+        and 'max_price' work as in search_games). NULLs never match a bound.
+        """
+        matched = np.ones(len(self.app_ids), dtype=bool)
+        for key, value in (filters or {}).items():
+            if key == 'platforms':
+                for platform in value:
+                    if platform not in FLAG_COLUMNS:
+                        raise ValueError(f"Unknown platform {platform!r}")
+                    matched &= self.columns[platform]
+            elif key.startswith('min_'):
+                matched &= self._numeric(key[4:]) >= float(value)
+            elif key.startswith('max_'):
+                matched &= self._numeric(key[4:]) <= float(value)
+            else:
+                raise ValueError(f"Unknown filter {key!r}")
+        return matched
+
+    def top_k(self, key: str, k: Optional[int] = 10, filters: Optional[Dict[str, Any]] = None,
+              descending: bool = True) -> List[GameRecord]:
+        """The k matching games with the highest (or lowest) key, ties by app_id.
+
+        Games where key is NULL are left out. An argpartition selects the k
+        before only those are sorted; k=None sorts every match.
+        """
+        values = self._numeric(key)
+        candidates = np.flatnonzero(self.mask(filters) & ~np.isnan(values))
+        ranked = -values[candidates] if descending else values[candidates]
+        if k is not None and 0 < k < len(candidates):
+            # Everything tied with the k-th value is kept so ties still break by app_id
+            threshold = ranked[np.argpartition(ranked, k - 1)[k - 1]]
+            keep = ranked <= threshold
+            candidates, ranked = candidates[keep], ranked[keep]
+        order = np.lexsort((self.app_ids[candidates], ranked))[:k]
+        return [self.record(position) for position in candidates[order]]
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes held, split into the arrays and the string objects they reference"""
+        arrays = [self.app_ids] + list(self.columns.values()) + list(self.nulls.values())
+        array_bytes = sum(array.nbytes for array in arrays)
+        return {'arrays': array_bytes, 'total': deep_size(arrays), 'games': len(self.app_ids)}
+
+def memory_report(store: GameStore, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Compare the bytes of the DictCursor rows a store was loaded from with the store"""
+    usage = store.memory_usage()
+    report = {'games': len(rows), 'dicts': deep_size(rows), 'store': usage['total'],
+              'store_arrays': usage['arrays']}
+    print(f"{report['games']} games: dicts {report['dicts'] / 1024:.0f} KiB, "
+          f"GameStore {report['store'] / 1024:.0f} KiB ({report['store_arrays'] / 1024:.0f} KiB arrays), "
+          f"{report['dicts'] / max(report['store'], 1):.1f}x smaller")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank games from the in-process column store")
+    parser.add_argument('--top', default='review_percentage',
+                        help="Column to rank by, e.g. review_percentage, peak_ccu, price")
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--ascending', action='store_true')
+    parser.add_argument('--platform', action='append', default=[], dest='platforms', choices=PLATFORMS)
+    parser.add_argument('--min-reviews', type=int, help="Only games with at least this many reviews")
+    parser.add_argument('--max-price', type=float)
+    parser.add_argument('--memory', action='store_true', help="Compare memory use with DictCursor rows")
+    args = parser.parse_args()
+
+    filters = {}
+    if args.platforms:
+        filters['platforms'] = args.platforms
+    if args.min_reviews is not None:
+        filters['min_total_reviews'] = args.min_reviews
+    if args.max_price is not None:
+        filters['max_price'] = args.max_price
+
+    store = GameStore()
+    start = time.perf_counter()
+    rows = store._fetch()
+    store.load(rows)
+    print(f"Loaded {len(store)} games in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    top = store.top_k(args.top, args.k, filters, descending=not args.ascending)
+    print(f"Top {args.k} by {args.top} ({(time.perf_counter() - start) * 1000:.2f} ms):")
+    values = store._numeric(args.top)
+    for record in top:
+        print(f"  {record.app_id}: {record.name} ({values[store.position(record.app_id)]:.2f})")
+    if args.memory:
+        memory_report(store, rows)
@@ -0,0 +1,153 @@
+from typing import List, Dict, Any, Optional
+import json
+from pymysql.constants import SERVER_STATUS
+
+# Denormalized one-row-per-game table for list and browse pages
+GAME_SUMMARY_SCHEMA = """
+            app_id BIGINT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            release_date DATE,
+            price DECIMAL(10,2),
+            header_image VARCHAR(255),
+            windows TINYINT(1),
+            mac TINYINT(1),
+            linux TINYINT(1),
+            metacritic_score INT,
+            positive_reviews INT,
+            negative_reviews INT,
+            review_percentage DECIMAL(5,2),
+            wilson_score DOUBLE,
+            average_playtime_hours DECIMAL(10,1),
+            median_playtime_hours DECIMAL(10,1),
+            genres JSON,
+            developers JSON,
+            updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)"""
+
+GAME_SUMMARY_KEYS = [
+    "INDEX idx_summary_name (name)",
+    "INDEX idx_summary_release_date (release_date)",
+    "INDEX idx_summary_price (price)",
+    "INDEX idx_summary_metacritic (metacritic_score)",
+    "INDEX idx_summary_positive (positive_reviews)",
+    "INDEX idx_summary_review_percentage (review_percentage)",
+    "INDEX idx_summary_wilson (wilson_score)",
+    "INDEX idx_summary_playtime (average_playtime_hours)",
+    "INDEX idx_summary_updated (updated_at)",
+]
+
+# Tombstones for deleted games, which leave no game_summary row to notice
+GAME_DELETIONS_SCHEMA = """
+            app_id BIGINT PRIMARY KEY,
+            deleted_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)"""
+
+GAME_DELETIONS_KEYS = ["INDEX idx_deletions_deleted (deleted_at)"]
+
+SUMMARY_COLUMNS = [
+    'app_id', 'name', 'release_date', 'price', 'header_image', 'windows', 'mac', 'linux',
+    'metacritic_score', 'positive_reviews', 'negative_reviews', 'review_percentage',
+    'wilson_score', 'average_playtime_hours', 'median_playtime_hours', 'genres', 'developers',
+]
+SUMMARY_LIST_COLUMNS = ['genres', 'developers']
+
+# z for a 95% confidence interval
+WILSON_Z = 1.96
+
+def wilson_sql(positive: str, negative: str, z: float = WILSON_Z) -> str:
+    """SQL for the lower bound of the Wilson score interval of positive / (positive + negative).
+
+    Unlike the plain ratio it ranks 9,000 of 10,000 positive above 10 of 10.
+    NULL when a game has no reviews.
+    """
+    # In floating point: INT / INT is a DECIMAL with 4 places in MySQL, coarser than the correction
+    n = f"NULLIF(CAST({positive} + {negative} AS DOUBLE), 0)"
+    p = f"({positive} / {n})"
+    return (f"(({p} + {z * z / 2:g} / {n} - {z:g} * SQRT(({p} * (1 - {p}) + {z * z / 4:g} / {n}) / {n}))"
+            f" / (1 + {z * z:g} / {n}))")
+
+SUMMARY_SELECT = f"""
+    SELECT g.app_id, g.name, g.release_date, g.price, g.header_image, g.windows, g.mac, g.linux,
+           g.metacritic_score, g.positive_reviews, g.negative_reviews,
+           ROUND(100 * g.positive_reviews / NULLIF(g.positive_reviews + g.negative_reviews, 0), 2),
+           {wilson_sql('g.positive_reviews', 'g.negative_reviews')},
+           ROUND(g.average_playtime_forever / 60, 1),
+           ROUND(g.median_playtime_forever / 60, 1),
+           COALESCE((SELECT JSON_ARRAYAGG(r.name) FROM game_genres j
+                     JOIN genres r ON r.id = j.genre_id WHERE j.app_id = g.app_id), JSON_ARRAY()),
+           COALESCE((SELECT JSON_ARRAYAGG(r.name) FROM game_developers j
+                     JOIN developers r ON r.id = j.developer_id WHERE j.app_id = g.app_id), JSON_ARRAY())
+    FROM games g"""
+
+# Columns added to game_summary after it was first created, with their indexes
+ADDED_SUMMARY_COLUMNS = {
+    'wilson_score': ("wilson_score DOUBLE AFTER review_percentage",
+                     ["INDEX idx_summary_wilson (wilson_score)",
+                      "INDEX idx_summary_playtime (average_playtime_hours)"]),
+    'updated_at': ("updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)",
+                   ["INDEX idx_summary_updated (updated_at)"]),
+}
+
+def ensure_summary_columns(connection):
+    """Add any ADDED_SUMMARY_COLUMNS missing from an existing game_summary table"""
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW COLUMNS FROM game_summary")
+        existing = {row['Field']: row['Type'] for row in cursor.fetchall()}
+        for column, (definition, keys) in ADDED_SUMMARY_COLUMNS.items():
+            if column not in existing:
+                print(f"Adding game_summary.{column}...")
+                cursor.execute(f"ALTER TABLE game_summary ADD COLUMN {definition}, "
+                               + ", ".join(f"ADD {key}" for key in keys))
+        if existing.get('updated_at') == 'timestamp':
+            # First added with one-second resolution, too coarse to tell rewrites apart
+            print("Widening game_summary.updated_at to microseconds...")
+            cursor.execute(f"ALTER TABLE game_summary MODIFY COLUMN {ADDED_SUMMARY_COLUMNS['updated_at'][0]}")
+    connection.commit()
+
+# Ids per incremental refresh statement
+REFRESH_CHUNK = 1000
+
+def record_deletions(cursor, app_ids: List[int]):
+    """Leave a game_deletions tombstone per deleted game for other processes' ChangeWatchers"""
+    cursor.executemany("INSERT INTO game_deletions (app_id) VALUES (%s) "
+                       "ON DUPLICATE KEY UPDATE deleted_at = CURRENT_TIMESTAMP(6)",
+                       [(app_id,) for app_id in app_ids])
+
+def refresh_game_summary(connection, app_ids: Optional[List[int]] = None) -> int:
+    """Rebuild game_summary rows from games and the junction tables; returns rows written.
+
+    With app_ids only those games are rebuilt (and dropped if they no longer
+    exist); without, the whole table is. Runs in one transaction (the
+    caller's, if one is open), so readers keep seeing the previous rows
+    until the commit. Rebuilt rows get a new updated_at, which is how other
+    processes learn about the write.
+    """
+    insert = f"INSERT INTO game_summary ({', '.join(SUMMARY_COLUMNS)}) {SUMMARY_SELECT}"
+    written = 0
+    try:
+        if not connection.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+            # Pooled connections autocommit; a caller's open transaction is joined instead
+            connection.begin()
+        with connection.cursor() as cursor:
+            if app_ids is None:
+                cursor.execute("DELETE FROM game_summary")
+                written = cursor.execute(insert)
+            else:
+                app_ids = list(dict.fromkeys(app_ids))
+                for start in range(0, len(app_ids), REFRESH_CHUNK):
+                    chunk = app_ids[start:start + REFRESH_CHUNK]
+                    placeholders = ', '.join(['%s'] * len(chunk))
+                    cursor.execute(f"DELETE FROM game_summary WHERE app_id IN ({placeholders})", chunk)
+                    written += cursor.execute(f"{insert} WHERE g.app_id IN ({placeholders})", chunk)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    return written
+
+def decode_summary(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Turn the JSON genre and developer columns of a summary row into lists"""
+    if row is None:
+        return None
+    for column in SUMMARY_LIST_COLUMNS:
+        if isinstance(row.get(column), str):
+            row[column] = json.loads(row[column])
+    return row
@@ -1,8 +1,17 @@
 import pymysql
 from typing import Dict, Any, List
 import sys
+import os
+import tempfile
 from datetime import datetime
+from decimal import Decimal
 from typing import Optional
+from pool import get_pool
+from cache import LRUCache, MISSING, invalidate_games
+from summary import (GAME_SUMMARY_SCHEMA, GAME_SUMMARY_KEYS, GAME_DELETIONS_SCHEMA, GAME_DELETIONS_KEYS,
+                     refresh_game_summary, record_deletions)
+from read import (DatabaseOperations as ReadOperations, GameDetails, encode_cursor, decode_cursor,
+                  seek_condition, fulltext_query)
 # Database configuration (same as before)
 DB_CONFIG = {
     "charset": "utf8mb4",
@@ -17,15 +26,86 @@ DB_CONFIG = {
     "write_timeout": 10,
 }
 
+def check(description: str, passed: bool) -> bool:
+    """Print a ✓/❌ line for one check"""
+    print(f"✓ {description}" if passed else f"❌ {description}")
+    return passed
+
+def test_helpers():
+    """Check the cache, cursor, search and CSV helpers; no database needed"""
+    print("0. Testing Helpers...")
+
+    cache = LRUCache(max_entries=2, ttl=None)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    check("LRUCache evicts the least recently used entry",
+          cache.get('b', MISSING) is MISSING and cache.get('a') == 1 and cache.get('c') == 3)
+
+    cache = LRUCache(ttl=None)
+    cache.set(('game', 1), 'one', tags=(1,))
+    cache.set(('details', 1), 'one', tags=(1,))
+    cache.set(('game', 2), 'two', tags=(2,))
+    generation = cache.generation
+    cache.invalidate_tags([1])
+    cache.set(('game', 1), 'stale', tags=(1,), generation=generation)
+    check("LRUCache drops tagged entries and skips sets that raced an invalidation",
+          cache.get(('game', 1), MISSING) is MISSING and
+          cache.get(('details', 1), MISSING) is MISSING and cache.get(('game', 2)) == 'two')
+
+    cursor = encode_cursor('price', False, {'price': Decimal('9.99'), 'app_id': 42})
+    check("decode_cursor reads back what encode_cursor wrote",
+          decode_cursor(cursor, 'price', False) == ('9.99', 42))
+    try:
+        decode_cursor(cursor, 'price', True)
+        check("decode_cursor rejects a cursor from the other direction", False)
+    except ValueError as e:
+        check("decode_cursor rejects a cursor from the other direction", 'ascending' in str(e))
+    try:
+        decode_cursor('not a cursor', 'price', False)
+        check("decode_cursor rejects garbage", False)
+    except ValueError:
+        check("decode_cursor rejects garbage", True)
+
+    check("seek_condition seeks past (value, app_id) ascending",
+          seek_condition('price', False, 10, 5) ==
+          ("(price > %s OR (price = %s AND app_id > %s))", [10, 10, 5]))
+    check("seek_condition keeps NULLs last when descending",
+          seek_condition('price', True, 10, 5) ==
+          ("(price < %s OR (price = %s AND app_id < %s) OR price IS NULL)", [10, 10, 5]))
+    check("seek_condition continues within NULLs when descending",
+          seek_condition('price', True, None, 5) == ("(price IS NULL AND app_id < %s)", [5]))
+    check("seek_condition on app_id alone", seek_condition('app_id', False, 7, 7) == ("app_id > %s", [7]))
+
+    check("fulltext_query requires every indexed word as a prefix",
+          fulltext_query('Call of Duty') == '+Call* +Duty*')
+    check("fulltext_query drops stopwords and operators", fulltext_query('The +Forest') == '+Forest*')
+    check("fulltext_query returns None without an indexable word", fulltext_query('a of') is None)
+
+    from creation import iter_csv_chunks
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write('AppID,Name,About the game\n'
+                    '1,One,"first line\nsecond line"\n'
+                    '2,Two,plain\n'
+                    '3,Three,"quoted, with comma"\n')
+        chunks = list(iter_csv_chunks(path, 2))
+        check("iter_csv_chunks splits by record, not by line",
+              [chunk.height for chunk in chunks] == [2, 1] and
+              chunks[0]['About the game'][0] == 'first line\nsecond line')
+    finally:
+        os.remove(path)
+    print()
+
 def test_connection() -> bool:
     """Test database connection"""
     try:
-        connection = pymysql.connect(**DB_CONFIG)
-        with connection.cursor() as cursor:
+        with get_pool(DB_CONFIG).connection() as connection, connection.cursor() as cursor:
             cursor.execute("SELECT VERSION()")
             version = cursor.fetchone()
             print(f"Successfully connected to MySQL version: {version['VERSION()']}")
-        connection.close()
         return True
     except Exception as e:
         print(f"Connection error: {e}")
@@ -111,7 +191,9 @@ def create_tables(connection):
                 INDEX idx_name (name),
                 INDEX idx_release_date (release_date),
                 INDEX idx_price (price),
-                INDEX idx_metacritic (metacritic_score)
+                INDEX idx_metacritic (metacritic_score),
+                FULLTEXT INDEX ft_name (name),
+                FULLTEXT INDEX ft_name_about (name, about_the_game)
             )
         """)
         print("✓ Created games table")
@@ -237,22 +319,39 @@ def create_tables(connection):
         """)
         print("✓ Created game_tags table")
 
+        # Denormalized list view, kept in sync by the write operations below
+        keys = ''.join(f",\n                {key}" for key in GAME_SUMMARY_KEYS)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS game_summary ({GAME_SUMMARY_SCHEMA}{keys}
+            )
+        """)
+        print("✓ Created game_summary table")
+
+        keys = ''.join(f",\n                {key}" for key in GAME_DELETIONS_KEYS)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS game_deletions ({GAME_DELETIONS_SCHEMA}{keys}
+            )
+        """)
+        print("✓ Created game_deletions table")
+
         connection.commit()
         print("✓ All tables created successfully")
-class DatabaseOperations:
-    def __init__(self, connection):
-        self.connection = connection
+class DatabaseOperations(ReadOperations):
+    """Read operations from read.py plus the write side used by the tests"""
 
     # CREATE Operations
     def insert_game(self, game_data: Dict[str, Any]) -> bool:
         """Insert a new game into the database"""
         try:
-            with self.connection.cursor() as cursor:
+            with self._connection() as connection, connection.cursor() as cursor:
+                connection.begin()
                 columns = ', '.join(game_data.keys())
                 placeholders = ', '.join(['%s'] * len(game_data))
                 query = f"INSERT INTO games ({columns}) VALUES ({placeholders})"
                 cursor.execute(query, list(game_data.values()))
-                self.connection.commit()
+                # Commits the new game together with its summary row
+                refresh_game_summary(connection, [game_data['app_id']])
+                invalidate_games([game_data['app_id']])
                 return True
         except Exception as e:
             print(f"Error inserting game: {e}")
@@ -261,7 +360,8 @@ class DatabaseOperations:
     def insert_developer(self, name: str) -> Optional[int]:
         """Insert a new developer and return their ID"""
         try:
-            with self.connection.cursor() as cursor:
+            with self._connection() as connection, connection.cursor() as cursor:
+                connection.begin()
                 cursor.execute(
                     "INSERT IGNORE INTO developers (name) VALUES (%s)",
                     (name,)
@@ -272,68 +372,30 @@ class DatabaseOperations:
                         (name,)
                     )
                     result = cursor.fetchone()
-                    self.connection.commit()
+                    connection.commit()
                     return result['id'] if result else None
                 return None
         except Exception as e:
             print(f"Error inserting developer: {e}")
             return None
 
-    # READ Operations
-    def get_game(self, app_id: int) -> Optional[Dict[str, Any]]:
-        """Get a game by its app_id"""
-        try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT * FROM games WHERE app_id = %s
-                """, (app_id,))
-                return cursor.fetchone()
-        except Exception as e:
-            print(f"Error getting game: {e}")
-            return None
-
-    def search_games(self, filters: Dict[str, Any] = None, limit: int = 10) -> List[Dict[str, Any]]:
-        """Search games with filters"""
-        try:
-            with self.connection.cursor() as cursor:
-                query = "SELECT DISTINCT g.* FROM games g"
-                conditions = []
-                params = []
-
-                if filters:
-                    if 'name' in filters:
-                        conditions.append("g.name LIKE %s")
-                        params.append(f"%{filters['name']}%")
-                    if 'min_price' in filters:
-                        conditions.append("g.price >= %s")
-                        params.append(filters['min_price'])
-                    if 'max_price' in filters:
-                        conditions.append("g.price <= %s")
-                        params.append(filters['max_price'])
-
-                if conditions:
-                    query += " WHERE " + " AND ".join(conditions)
-
-                query += " LIMIT %s"
-                params.append(limit)
-
-                cursor.execute(query, params)
-                return cursor.fetchall()
-        except Exception as e:
-            print(f"Error searching games: {e}")
-            return []
+    # READ Operations (get_game, search_games, ...) are inherited from read.py
 
     # UPDATE Operations
     def update_game(self, app_id: int, update_data: Dict[str, Any]) -> bool:
         """Update a game's information"""
         try:
-            with self.connection.cursor() as cursor:
+            with self._connection() as connection, connection.cursor() as cursor:
+                connection.begin()
                 set_clause = ", ".join([f"{k} = %s" for k in update_data.keys()])
                 query = f"UPDATE games SET {set_clause} WHERE app_id = %s"
                 params = list(update_data.values()) + [app_id]
                 cursor.execute(query, params)
-                self.connection.commit()
-                return cursor.rowcount > 0
+                updated = cursor.rowcount > 0
+                # Commits the update together with its summary row
+                refresh_game_summary(connection, [app_id])
+                invalidate_games([app_id])
+                return updated
         except Exception as e:
             print(f"Error updating game: {e}")
             return False
@@ -342,19 +404,25 @@ class DatabaseOperations:
     def delete_game(self, app_id: int) -> bool:
         """Delete a game and its related records"""
         try:
-            with self.connection.cursor() as cursor:
+            with self._connection() as connection, connection.cursor() as cursor:
+                connection.begin()
                 # Delete related records first
                 related_tables = [
                     'game_tags', 'game_genres', 'game_categories',
-                    'game_publishers', 'game_developers', 'screenshots', 'movies'
+                    'game_publishers', 'game_developers', 'screenshots', 'movies',
+                    'game_summary'
                 ]
                 for table in related_tables:
                     cursor.execute(f"DELETE FROM {table} WHERE app_id = %s", (app_id,))
 
                 # Delete the game
                 cursor.execute("DELETE FROM games WHERE app_id = %s", (app_id,))
-                self.connection.commit()
-                return cursor.rowcount > 0
+                deleted = cursor.rowcount > 0
+                # Other processes learn about the delete from the tombstone
+                record_deletions(cursor, [app_id])
+                connection.commit()
+                invalidate_games([app_id])
+                return deleted
         except Exception as e:
             print(f"Error deleting game: {e}")
             return False
@@ -390,6 +458,34 @@ def test_crud_operations(connection):
     else:
         print("❌ Failed to retrieve test game")
 
+    games = db_ops.get_games([999999, -1])
+    check("get_games returns the game and None for a missing id",
+          list(games) == [999999, -1] and games[999999] is not None and
+          games[999999]['name'] == 'Test Game' and games[-1] is None)
+
+    details = db_ops.get_game_details([999999])[999999]
+    check("get_game_details returns the game with its (empty) relationships",
+          isinstance(details, GameDetails) and details.game['name'] == 'Test Game' and
+          details.developers == [] and details.screenshots == [])
+
+    # A cursor just before the test game, so the checks don't depend on other rows
+    before = encode_cursor('app_id', False, {'app_id': 999998})
+    rows, next_cursor = db_ops.get_games_page('app_id', 1, after=before)
+    check("get_games_page seeks to the next app_id",
+          [row['app_id'] for row in rows] == [999999])
+    if next_cursor is not None:
+        rows, _ = db_ops.get_games_page('app_id', 1, after=next_cursor)
+        check("get_games_page continues after its cursor", all(row['app_id'] > 999999 for row in rows))
+    rows, _ = next(db_ops.iter_games('app_id', 1, after=before))
+    check("iter_games yields the same first page", [row['app_id'] for row in rows] == [999999])
+
+    results = db_ops.search_games({'name': 'Test Game'}, limit=1000, profile='card')
+    check("search_games finds the game through the FULLTEXT index",
+          999999 in [game['app_id'] for game in results])
+
+    rows, _ = db_ops.browse_games('app_id', 1, after=before, descending=False)
+    check("browse_games lists the game's summary row", [row['app_id'] for row in rows] == [999999])
+
     # Test UPDATE
     print("\nTesting UPDATE operations...")
     update_data = {
@@ -400,6 +496,9 @@ def test_crud_operations(connection):
         print("✓ Successfully updated test game")
     else:
         print("❌ Failed to update test game")
+    updated = db_ops.get_game(999999)
+    check("get_game sees the update instead of the cached row",
+          updated is not None and updated['price'] == Decimal('39.99'))
 
     # Test DELETE
     print("\nTesting DELETE operations...")
@@ -407,13 +506,16 @@ def test_crud_operations(connection):
         print("✓ Successfully deleted test game")
     else:
         print("❌ Failed to delete test game")
+    check("get_game no longer finds the deleted game", db_ops.get_game(999999) is None)
         
 
 
 def run_all_tests():
     """Run all database tests"""
     print("\n=== Starting Database Tests ===\n")
-    
+
+    test_helpers()
+
     # Test 1: Connection
     print("1. Testing Database Connection...")
     if not test_connection():
@@ -437,7 +539,7 @@ def run_all_tests():
         expected_tables = {
             'games', 'developers', 'publishers', 'categories', 'genres', 'tags',
             'screenshots', 'movies', 'game_developers', 'game_publishers',
-            'game_categories', 'game_genres', 'game_tags'
+            'game_categories', 'game_genres', 'game_tags', 'game_summary', 'game_deletions'
         }
         
         actual_tables = set(table_info.keys())